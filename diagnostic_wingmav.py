@@ -13,14 +13,18 @@ Run ``python diagnostic_wingmav.py --help`` for usage details.
 from __future__ import annotations
 
 import argparse
+import collections
 import contextlib
+import functools
+import importlib
+import importlib.util
 import os
 import platform
 import shutil
 import sys
 import time
-from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Tuple
+from array import array
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 
 try:
     from pymavlink import mavutil  # type: ignore
@@ -51,6 +55,33 @@ BUTTON_LABELS = {
     BTN_DISARM: "Disarm",
 }
 
+# Index-addressable copies of the label maps used on the per-event path.
+_AXIS_LABEL_TABLE = tuple(AXIS_LABELS.get(i, f"Axis {i}") for i in range(8))
+_BUTTON_LABEL_TABLE = tuple(BUTTON_LABELS.get(i, f"Button {i}") for i in range(16))
+
+_PWM_REPORT = "Computed PWM → roll={} pitch={} throttle={} yaw={}"
+
+# Seconds between the aggregated activity lines printed in non-verbose mode.
+_SUMMARY_INTERVAL = 1.0
+
+# Axis slots the session always tracks, with the value assumed for an axis the
+# joystick does not report (throttle rests at the bottom of its travel).
+_AXIS_DEFAULTS = (0.0, 0.0, 0.0, -1.0)
+
+# Combined roll/pitch/yaw movement (in normalised stick units) below which an
+# unforced override refresh is treated as analogue noise and skipped.
+_AXIS_NOISE_THRESHOLD = 0.002
+
+
+def _clamp_pwm(value: float) -> int:
+    """Clamp a scaled stick value to the 1000-2000 µs RC PWM range."""
+
+    if value < 1000:
+        return 1000
+    if value > 2000:
+        return 2000
+    return int(value)
+
 
 def print_header() -> None:
     """Emit a high-level environment summary."""
@@ -62,13 +93,18 @@ def print_header() -> None:
     print()
 
 
+@functools.lru_cache(maxsize=None)
 def describe_module(name: str) -> Tuple[str, Optional[str]]:
     """Return the availability and version string of a module."""
 
-    try:
-        module = __import__(name)
-    except Exception as exc:  # pragma: no cover - purely informational
-        return ("missing", str(exc))
+    module = sys.modules.get(name)
+    if module is None:
+        try:
+            if importlib.util.find_spec(name) is None:
+                return ("missing", None)
+            module = importlib.import_module(name)
+        except Exception as exc:  # pragma: no cover - purely informational
+            return ("missing", str(exc))
 
     version = getattr(module, "__version__", None)
     if version is None and hasattr(module, "version"):
@@ -105,8 +141,7 @@ def report_environment() -> None:
     print()
 
 
-@dataclass
-class JoystickInfo:
+class JoystickInfo(NamedTuple):
     index: int
     name: str
     guid: Optional[str]
@@ -130,8 +165,11 @@ def ensure_pygame(args: argparse.Namespace):
         # Fall back to the SDL "dummy" driver when running without an X server.
         os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 
+    # Only bring up the subsystems the diagnostics use: the display subsystem
+    # drives SDL's event pump, and joystick handles the devices.  pygame.init()
+    # would also open audio and other unused subsystems.
     try:
-        pygame.init()
+        pygame.display.init()
         pygame.joystick.init()
     except Exception as exc:  # pragma: no cover - system dependent
         print(f"ERROR: pygame failed to initialise joystick support: {exc}")
@@ -147,10 +185,15 @@ def enumerate_joysticks(pygame_module) -> Dict[int, JoystickInfo]:
     """Return metadata about all joysticks currently visible to pygame."""
 
     info: Dict[int, JoystickInfo] = {}
+    # pygame 2 opens joysticks on construction; only older releases need an
+    # explicit init(), and those devices are closed together once inspected.
+    opened = []
     count = pygame_module.joystick.get_count()
     for idx in range(count):
         js = pygame_module.joystick.Joystick(idx)
-        js.init()
+        if not js.get_init():
+            js.init()
+            opened.append(js)
         guid = None
         if hasattr(js, "get_guid"):
             with contextlib.suppress(Exception):
@@ -164,6 +207,7 @@ def enumerate_joysticks(pygame_module) -> Dict[int, JoystickInfo]:
             hats=js.get_numhats(),
             trackballs=getattr(js, "get_numballs", lambda: 0)(),
         )
+    for js in opened:
         js.quit()
     return info
 
@@ -202,6 +246,12 @@ class MavlinkReporter:
         self.target_component = target_component
         self.verbose = verbose
         self._last_override: Optional[Tuple[int, int, int, int]] = None
+        # Reused RC_CHANNELS_OVERRIDE messages; only channels 1-4 change per send
+        # while the all-zero "release" message is constant.
+        self._override_msg = None
+        self._clear_msg = None
+        self._override_count = 0
+        self._next_override_summary = 0.0
 
         self.connection = None
         if endpoint and mavutil is not None:
@@ -212,6 +262,12 @@ class MavlinkReporter:
                     source_component=source_component,
                     autoreconnect=True,
                 )
+                self._override_msg = mavutil.mavlink.MAVLink_rc_channels_override_message(
+                    target_system, target_component, 0, 0, 0, 0, 0, 0, 0, 0
+                )
+                self._clear_msg = mavutil.mavlink.MAVLink_rc_channels_override_message(
+                    target_system, target_component, 0, 0, 0, 0, 0, 0, 0, 0
+                )
                 if wait_heartbeat:
                     print("Waiting for MAVLink heartbeat …")
                     msg = self.connection.wait_heartbeat(timeout=10)
@@ -257,41 +313,44 @@ class MavlinkReporter:
         if payload == self._last_override:
             return
         self._last_override = payload
-        self._emit(f"RC override: roll={roll} pitch={pitch} throttle={throttle} yaw={yaw}")
+        if self.verbose:
+            self._emit(f"RC override: roll={roll} pitch={pitch} throttle={throttle} yaw={yaw}")
+        else:
+            self._override_count += 1
+            if time.monotonic() >= self._next_override_summary:
+                self._report_override_summary()
         if self.connection:
+            msg = self._override_msg
+            msg.chan1_raw = roll
+            msg.chan2_raw = pitch
+            msg.chan3_raw = throttle
+            msg.chan4_raw = yaw
             try:
-                self.connection.mav.rc_channels_override_send(
-                    self.target_system,
-                    self.target_component,
-                    roll,
-                    pitch,
-                    throttle,
-                    yaw,
-                    0,
-                    0,
-                    0,
-                    0,
-                )
+                self.connection.mav.send(msg)
             except Exception as exc:  # pragma: no cover - autopilot dependent
                 self._emit(f"ERROR sending RC override: {exc}")
 
+    def _report_override_summary(self) -> None:
+        """Print the latest override together with how many were sent since the last report."""
+
+        count = self._override_count
+        if not count or self._last_override is None:
+            return
+        roll, pitch, throttle, yaw = self._last_override
+        self._emit(
+            f"RC override: roll={roll} pitch={pitch} throttle={throttle} yaw={yaw}"
+            f" ({count} sent)"
+        )
+        self._override_count = 0
+        self._next_override_summary = time.monotonic() + _SUMMARY_INTERVAL
+
     def clear_override(self) -> None:
+        self._report_override_summary()
         self._emit("Clear RC override")
         self._last_override = None
         if self.connection:
             try:
-                self.connection.mav.rc_channels_override_send(
-                    self.target_system,
-                    self.target_component,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                )
+                self.connection.mav.send(self._clear_msg)
             except Exception as exc:  # pragma: no cover - autopilot dependent
                 self._emit(f"ERROR clearing RC override: {exc}")
 
@@ -310,6 +369,7 @@ class JoystickSession:
         *,
         device_index: int,
         poll_hz: float,
+        override_hz: float = 50.0,
         duration: Optional[float],
         mavlink: MavlinkReporter,
         verbose: bool,
@@ -317,16 +377,33 @@ class JoystickSession:
         self.pg = pygame_module
         self.device_index = device_index
         self.poll_interval = 1.0 / poll_hz if poll_hz > 0 else 0.1
+        self.min_send_interval = 1.0 / override_hz if override_hz > 0 else 0.0
         self.duration = duration
         self.mavlink = mavlink
         self.verbose = verbose
 
         self.joystick = None
-        self.axis_values: Dict[int, float] = {}
-        self.center_offsets = {AXIS_ROLL: 0.0, AXIS_PITCH: 0.0, AXIS_YAW: 0.0}
+        self.axis_values = array("d", _AXIS_DEFAULTS)
+        # Indexed by axis number; the throttle slot stays at zero.
+        self.center_offsets = array("d", (0.0, 0.0, 0.0, 0.0))
         self.control_active = False
         self.prev_mode = "UNKNOWN"
         self._start_time = None
+        self._last_pwm: Tuple[int, int, int, int] = (-1, -1, -1, -1)
+        self._last_sample: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)
+        self._axis_event_counts: collections.Counter = collections.Counter()
+        self._next_send_ts = 0.0
+        self._send_pending = False
+        self._next_summary_ts = 0.0
+
+        # Resolve pygame's event-type constants once and dispatch by lookup.
+        self._dispatch = {
+            pygame_module.JOYAXISMOTION: self._on_axis_motion,
+            pygame_module.JOYBUTTONDOWN: self._on_button_down,
+            pygame_module.JOYBUTTONUP: self._on_button_up,
+            pygame_module.JOYDEVICEADDED: self._on_device_added,
+            pygame_module.JOYDEVICEREMOVED: self._on_device_removed,
+        }
 
     def setup(self) -> bool:
         count = self.pg.joystick.get_count()
@@ -343,9 +420,15 @@ class JoystickSession:
             f"Using joystick [{self.device_index}] {self.joystick.get_name()} "
             f"(axes={self.joystick.get_numaxes()} buttons={self.joystick.get_numbuttons()})"
         )
-        for axis in range(self.joystick.get_numaxes()):
+        num_axes = self.joystick.get_numaxes()
+        axis_values = array("d", _AXIS_DEFAULTS)
+        if num_axes > len(axis_values):
+            axis_values.extend([0.0] * (num_axes - len(axis_values)))
+        get_axis = self.joystick.get_axis
+        for axis in range(num_axes):
             with contextlib.suppress(Exception):
-                self.axis_values[axis] = self.joystick.get_axis(axis)
+                axis_values[axis] = get_axis(axis)
+        self.axis_values = axis_values
         self._start_time = time.monotonic()
         return True
 
@@ -357,73 +440,129 @@ class JoystickSession:
     def run(self) -> None:
         assert self.joystick is not None
         print("Listening for joystick activity. Press Ctrl+C to exit.")
+        poll_ms = max(1, int(self.poll_interval * 1000))
         try:
             while True:
+                timeout_ms = poll_ms
+                if self.duration is not None:
+                    remaining = self.duration - self._elapsed()
+                    if remaining <= 0:
+                        print("Duration reached. Exiting diagnostic loop.")
+                        break
+                    timeout_ms = min(poll_ms, max(1, int(remaining * 1000)))
+                if self._send_pending:
+                    # Wake up in time to flush the override held back by the rate limit.
+                    until_send = self._next_send_ts - time.monotonic()
+                    timeout_ms = min(timeout_ms, max(1, int(until_send * 1000)))
+
+                # Block inside SDL until an event arrives instead of sleeping a
+                # fixed interval between polls.
+                event = self.pg.event.wait(timeout_ms)
+                if event.type == self.pg.NOEVENT:
+                    self._print_axis_summary()
+                    # Idle timeout: refresh held-axis overrides only while engaged.
+                    if self.control_active:
+                        self._send_override()
+                    continue
+
+                self._handle_event(event)
                 for event in self.pg.event.get():
                     self._handle_event(event)
-
-                if self.control_active:
+                if self._send_pending and time.monotonic() >= self._next_send_ts:
                     self._send_override()
-
-                if self.duration is not None and self._elapsed() >= self.duration:
-                    print("Duration reached. Exiting diagnostic loop.")
-                    break
-
-                time.sleep(self.poll_interval)
         except KeyboardInterrupt:
             print("Interrupted by user. Exiting diagnostic loop.")
         finally:
+            self._print_axis_summary(force=True)
             self.mavlink.clear_override()
             self.pg.event.clear()
             self.joystick.quit()
 
     # ------------------------------------------------------------------
     def _handle_event(self, event) -> None:
-        etype = event.type
-        if etype == self.pg.JOYAXISMOTION:
-            self.axis_values[event.axis] = event.value
-            label = AXIS_LABELS.get(event.axis, f"Axis {event.axis}")
-            print(f"Axis {event.axis} ({label}) → {event.value:+.3f}")
-            if self.control_active:
-                self._send_override(force=True)
-
-        elif etype == self.pg.JOYBUTTONDOWN:
-            label = BUTTON_LABELS.get(event.button, f"Button {event.button}")
-            print(f"Button {event.button} ({label}) pressed")
-            if event.button == BTN_TRIGGER:
-                self._engage_control()
-            elif event.button == BTN_RTL:
-                self.mavlink.set_mode("RTL")
-            elif event.button == BTN_DISARM:
-                self.mavlink.disarm()
-
-        elif etype == self.pg.JOYBUTTONUP:
-            label = BUTTON_LABELS.get(event.button, f"Button {event.button}")
-            print(f"Button {event.button} ({label}) released")
-            if event.button == BTN_TRIGGER and self.control_active:
+        handler = self._dispatch.get(event.type)
+        if handler is not None:
+            handler(event)
+
+    def _on_axis_motion(self, event, _labels=_AXIS_LABEL_TABLE) -> None:
+        # ``_labels`` is bound at definition time so the per-event path reads a local.
+        axis = event.axis
+        if axis < len(self.axis_values):
+            self.axis_values[axis] = event.value
+        if self.verbose:
+            label = _labels[axis] if axis < 8 else f"Axis {axis}"
+            print(f"Axis {axis} ({label}) → {event.value:+.3f}")
+        else:
+            self._axis_event_counts[axis] += 1
+            self._print_axis_summary()
+        if self.control_active:
+            self._send_override()
+
+    def _on_button_down(self, event) -> None:
+        button = event.button
+        label = _BUTTON_LABEL_TABLE[button] if button < 16 else f"Button {button}"
+        print(f"Button {button} ({label}) pressed")
+        if button == BTN_TRIGGER:
+            self._engage_control()
+        elif button == BTN_RTL:
+            self.mavlink.set_mode("RTL")
+        elif button == BTN_DISARM:
+            self.mavlink.disarm()
+
+    def _on_button_up(self, event) -> None:
+        button = event.button
+        label = _BUTTON_LABEL_TABLE[button] if button < 16 else f"Button {button}"
+        print(f"Button {button} ({label}) released")
+        if button == BTN_TRIGGER and self.control_active:
+            self._disengage_control()
+
+    def _on_device_added(self, event) -> None:
+        print(f"Joystick device added (index={event.device_index}).")
+
+    def _on_device_removed(self, event) -> None:
+        instance_id = getattr(event, "instance_id", getattr(event, "joy", "unknown"))
+        print(f"Joystick device removed (instance_id={instance_id}).")
+        if self.control_active and self.joystick:
+            current_id = None
+            if hasattr(self.joystick, "get_instance_id"):
+                with contextlib.suppress(Exception):
+                    current_id = self.joystick.get_instance_id()
+            if current_id is not None and instance_id == current_id:
+                print("Active joystick was disconnected. Disengaging control.")
                 self._disengage_control()
 
-        elif etype == self.pg.JOYDEVICEADDED:
-            print(f"Joystick device added (index={event.device_index}).")
-
-        elif etype == self.pg.JOYDEVICEREMOVED:
-            instance_id = getattr(event, "instance_id", getattr(event, "joy", "unknown"))
-            print(f"Joystick device removed (instance_id={instance_id}).")
-            if self.control_active and self.joystick:
-                current_id = None
-                if hasattr(self.joystick, "get_instance_id"):
-                    with contextlib.suppress(Exception):
-                        current_id = self.joystick.get_instance_id()
-                if current_id is not None and instance_id == current_id:
-                    print("Active joystick was disconnected. Disengaging control.")
-                    self._disengage_control()
+    # ------------------------------------------------------------------
+    def _print_axis_summary(self, force: bool = False) -> None:
+        """Print one line summarising axis motion since the previous summary.
+
+        ``force`` prints straight away instead of waiting out the interval.
+        """
+
+        counts = self._axis_event_counts
+        if not counts:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_summary_ts:
+            return
+        self._next_summary_ts = now + _SUMMARY_INTERVAL
+        parts = []
+        for axis in sorted(counts):
+            label = _AXIS_LABEL_TABLE[axis] if axis < 8 else f"Axis {axis}"
+            if axis < len(self.axis_values):
+                parts.append(f"{label} {self.axis_values[axis]:+.3f} ({counts[axis]} events)")
+            else:
+                parts.append(f"{label} ({counts[axis]} events)")
+        counts.clear()
+        print("Axis activity → " + ", ".join(parts))
 
     # ------------------------------------------------------------------
     def _engage_control(self) -> None:
         assert self.joystick is not None
+        get_axis = self.joystick.get_axis
+        offsets = self.center_offsets
         for axis in (AXIS_ROLL, AXIS_PITCH, AXIS_YAW):
             with contextlib.suppress(Exception):
-                self.center_offsets[axis] = self.joystick.get_axis(axis)
+                offsets[axis] = get_axis(axis)
         self.prev_mode = "GUIDED"
         print(
             "Trigger engaged → capturing center offsets "
@@ -434,39 +573,79 @@ class JoystickSession:
         self.control_active = True
         self.mavlink.set_mode("GUIDED")
         self._send_override(force=True)
+        if not self.verbose:
+            # Verbose mode already reported the PWM from inside _send_override.
+            print(_PWM_REPORT.format(*self._last_pwm))
 
     # ------------------------------------------------------------------
     def _disengage_control(self) -> None:
         self.control_active = False
+        self._send_pending = False
         self.mavlink.clear_override()
+        self._print_axis_summary(force=True)
         print("Trigger released → control disengaged. Suggested fallback mode: LOITER")
         self.mavlink.set_mode("LOITER")
 
     # ------------------------------------------------------------------
-    def _send_override(self, force: bool = False) -> None:
-        roll = self.axis_values.get(AXIS_ROLL, 0.0)
-        pitch = self.axis_values.get(AXIS_PITCH, 0.0)
-        yaw = self.axis_values.get(AXIS_YAW, 0.0)
-        throttle = self.axis_values.get(AXIS_THROTTLE, -1.0)
-
-        roll_deflect = roll - self.center_offsets[AXIS_ROLL]
-        pitch_deflect = pitch - self.center_offsets[AXIS_PITCH]
-        yaw_deflect = yaw - self.center_offsets[AXIS_YAW]
-
-        roll_pwm = int(max(1000, min(2000, 1500 + (roll_deflect * 500))))
-        pitch_pwm = int(max(1000, min(2000, 1500 + (pitch_deflect * 500))))
-        yaw_pwm = int(max(1000, min(2000, 1500 + (yaw_deflect * 500))))
-        throttle_pwm = int(max(1000, min(2000, 1500 + (throttle * 500))))
-
-        if force or self.verbose:
-            print(
-                "Computed PWM → "
-                f"roll={roll_pwm} pitch={pitch_pwm} throttle={throttle_pwm} yaw={yaw_pwm}"
+    def _send_override(
+        self,
+        force: bool = False,
+        *,
+        _clamp=_clamp_pwm,
+        _abs=abs,
+        _monotonic=time.monotonic,
+    ) -> None:
+        # Keyword-only defaults bind module-level helpers as fast locals.
+        axis_values = self.axis_values
+        sample = (
+            axis_values[AXIS_ROLL],
+            axis_values[AXIS_PITCH],
+            axis_values[AXIS_YAW],
+            axis_values[AXIS_THROTTLE],
+        )
+        if not force:
+            last = self._last_sample
+            movement = (
+                _abs(sample[0] - last[0]) + _abs(sample[1] - last[1]) + _abs(sample[2] - last[2])
             )
+            if movement < _AXIS_NOISE_THRESHOLD and sample[3] == last[3]:
+                # Back at the last sent position: nothing is left to flush.
+                self._send_pending = False
+                return
+
+        offsets = self.center_offsets
+        roll_deflect = sample[0] - offsets[AXIS_ROLL]
+        pitch_deflect = sample[1] - offsets[AXIS_PITCH]
+        yaw_deflect = sample[2] - offsets[AXIS_YAW]
+
+        roll_pwm = _clamp(1500 + (roll_deflect * 500))
+        pitch_pwm = _clamp(1500 + (pitch_deflect * 500))
+        yaw_pwm = _clamp(1500 + (yaw_deflect * 500))
+        throttle_pwm = _clamp(1500 + (sample[3] * 500))
+
+        pwm = (roll_pwm, pitch_pwm, throttle_pwm, yaw_pwm)
+        if not force and pwm == self._last_pwm:
+            self._send_pending = False
+            return
+        now = _monotonic()
+        if not force and now < self._next_send_ts:
+            # Coalesce: the latest axis values are sent once the interval lapses.
+            self._send_pending = True
+            return
+        self._send_pending = False
+        self._next_send_ts = now + self.min_send_interval
+        self._last_pwm = pwm
+        self._last_sample = sample
+
+        if self.verbose:
+            print(_PWM_REPORT.format(*pwm))
         self.mavlink.send_rc_override(roll_pwm, pitch_pwm, throttle_pwm, yaw_pwm)
 
 
-def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def _get_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser once and reuse it across invocations."""
+
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
         "--device-index",
@@ -484,7 +663,13 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         "--poll-hz",
         type=float,
         default=20.0,
-        help="How often to poll for events when idle (default: %(default)s)",
+        help="How often to wake up when no events arrive (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--override-hz",
+        type=float,
+        default=50.0,
+        help="Maximum RC override send rate while engaged (default: %(default)s)",
     )
     parser.add_argument(
         "--mavlink-endpoint",
@@ -530,7 +715,11 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Print additional debugging details",
     )
-    return parser.parse_args(argv)
+    return parser
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    return _get_parser().parse_args(argv)
 
 
 def main(argv: Optional[Iterable[str]] = None) -> int:
@@ -564,6 +753,7 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
             pygame_module,
             device_index=args.device_index,
             poll_hz=args.poll_hz,
+            override_hz=args.override_hz,
             duration=args.duration,
             mavlink=mavlink,
             verbose=args.verbose,
@@ -23,6 +23,17 @@ Button mappings:
 Logging:
     - By default, log messages are printed to the MAVProxy console.
     - Set LOG_TO_FILE = True and adjust LOG_FILE_PATH to enable file logging.
+
+Event filtering:
+    - On startup the module blocks every pygame event type except joystick axis,
+      button and hotplug events. pygame's queue is process-wide, so other pygame
+      users in the same MAVProxy process will stop receiving keyboard/mouse/window events
+      until the module is unloaded, which restores the filter that was in place before.
+    - On Linux, when the joystick's /dev/input/jsN node can be matched by name, axis
+      and button input is read from that node instead and pygame's axis/button events
+      are blocked too; pygame is then only pumped about once a second for hotplug.
+    - Axis motion events are also blocked while control is off; the stick centres are
+      read from SDL's joystick state when the trigger is pressed.
     
 Autoload:
     - Place this file in your MAVProxy modules folder.
@@ -32,6 +43,13 @@ Author: github.com/fitoori
 Date: March 5, 2025
 """
 
+import collections
+import glob
+import os
+import selectors
+import struct
+import sys
+import threading
 import time
 
 
@@ -52,6 +70,24 @@ def _coerce_bool(value, default=False):
             return False
     return default
 
+
+# Console prefixes for normal and warning messages
+_LOG_PREFIX = "JoystickCtrl:"
+_WARN_PREFIX = "JoystickCtrl [WARN]:"
+
+# RC PWM range and stick scaling (µs)
+_PWM_LO, _PWM_HI, _PWM_SCALE, _PWM_MID = 1000, 2000, 500, 1500
+
+
+def _clamp_pwm(value):
+    """Clamp a scaled stick value to the 1000-2000 µs RC PWM range."""
+
+    if value < _PWM_LO:
+        return _PWM_LO
+    if value > _PWM_HI:
+        return _PWM_HI
+    return int(value)
+
 try:
     import pygame  # type: ignore
 except ImportError:  # pragma: no cover - pygame optional for external integrations
@@ -60,9 +96,27 @@ except ImportError:  # pragma: no cover - pygame optional for external integrati
 from pymavlink import mavutil
 from MAVProxy.modules.lib import mp_module
 
+# MAVLink enum values used on the disarm paths, resolved once at import.
+_CMD_ARM_DISARM = mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+_RESULT_ACCEPTED = mavutil.mavlink.MAV_RESULT_ACCEPTED
+
 # Configuration variables
 LOG_TO_FILE = False  # Set to True to enable logging to file
 LOG_FILE_PATH = "/home/pi/joystick_control.log"  # Log file location
+PWM_DEADBAND = 2  # Ignore stick changes of at most this many µs on every channel
+OVERRIDE_RATE_HZ = 50  # Default cap on stick-driven RC override sends per second
+DIRECT_OVERRIDE_PERIOD = 0.1  # Resend interval (s) for overrides sent without the rc module
+AXIS_EPSILON = 0.002  # ~1 PWM step; smaller axis moves are dropped before any PWM work
+LOG_FLUSH_LINES = 32       # Wake the log writer after this many queued lines...
+LOG_FLUSH_INTERVAL = 1.0   # ...or once this many seconds have passed since it last wrote
+LOG_QUEUE_MAX = 1024       # Queued log lines kept when the disk stalls (oldest are dropped)
+INPUT_PUMP_INTERVAL = 1.0  # Seconds between SDL pumps (hotplug only) while joydev supplies input
+
+# Linux joydev event record (struct js_event: time, value, type, number) and type flags
+_JS_EVENT = struct.Struct("IhBB")
+_JS_EVENT_BUTTON = 0x01
+_JS_EVENT_AXIS = 0x02
+_JS_EVENT_INIT = 0x80
 
 # Joystick axis indices for control mapping (0-based indexing, per pygame)
 AXIS_ROLL     = 0  # Roll control (RC Channel 1)
@@ -75,7 +129,40 @@ BTN_TRIGGER = 0   # Trigger button: engage control when pressed, disengage when
 BTN_RTL     = 5   # Button to command RTL (Return-to-Launch)
 BTN_DISARM  = 6   # Button to disarm the vehicle
 
+# Flight modes the module requests itself, interned so status checks can compare by identity
+_GUIDED, _LOITER, _STABILIZE, _RTL = (sys.intern(m) for m in ("GUIDED", "LOITER", "STABILIZE", "RTL"))
+_CANONICAL_MODES = {m: m for m in (_GUIDED, _LOITER, _STABILIZE, _RTL)}
+
+
+def _canonical_mode(name):
+    """Return ``name`` upper-cased and interned; the well-known modes skip ``upper()``."""
+    canonical = _CANONICAL_MODES.get(name)
+    if canonical is None:
+        canonical = sys.intern(name.upper())
+    return canonical
+
+
+# Modes tried in order when restoring the pre-control mode fails on trigger release.
+# Entries are (mode, success_msg, pending_msg, failure_msg).
+_RELEASE_FALLBACK_PLAN = (
+    (
+        _LOITER,
+        "Trigger released: control off; LOITER active",
+        "Trigger released: awaiting LOITER ack",
+        "LOITER fallback failed; trying STABILIZE",
+    ),
+    (
+        _STABILIZE,
+        "Trigger released: control off; STABILIZE active",
+        "Trigger released: awaiting STABILIZE ack",
+        "Trigger released: control off; mode unchanged!",
+    ),
+)
+
 class JoystickControlModule(mp_module.MPModule):
+    # Axes read for every override, in (roll, pitch, yaw, throttle) order
+    _axis_indices = (AXIS_ROLL, AXIS_PITCH, AXIS_YAW, AXIS_THROTTLE)
+
     def __init__(
         self,
         mpstate,
@@ -86,6 +173,7 @@ class JoystickControlModule(mp_module.MPModule):
         auto_connect=True,
         pygame_module=None,
         manual_override_only=False,
+        override_hz=None,
     ):
         """
         Initialize the joystick control module.
@@ -96,6 +184,7 @@ class JoystickControlModule(mp_module.MPModule):
         - ``auto_connect``: defer joystick discovery until requested explicitly.
         - ``pygame_module``: inject a pygame-compatible shim for unit testing.
         - ``manual_override_only``: skip flight mode changes when taking/relinquishing control.
+        - ``override_hz``: cap on stick-driven RC override sends per second (default 50).
         """
         super(JoystickControlModule, self).__init__(mpstate, "wingmav", "Joystick control module")
         # Use instance variable for logging configuration
@@ -104,33 +193,82 @@ class JoystickControlModule(mp_module.MPModule):
         self.log_enabled = bool(log_to_file)
         self.log_file_path = log_file_path or LOG_FILE_PATH
         self.log_file = None
+        self._log_q = collections.deque(maxlen=LOG_QUEUE_MAX)  # Lines awaiting the writer thread
+        self._log_wake = threading.Event()
+        self._log_stop = False
+        self._log_thread = None
+        self._ts_cached_sec = 0       # Wall-clock second of the cached log timestamp
+        self._ts_cached_str = ""
 
         # State variables
         self.joystick = None          # Pygame joystick object
         self.joy_id = None            # Joystick device ID
         self.control_active = False   # True if joystick control is active
-        self.center_offsets = [0.0, 0.0, 0.0]  # Neutral offsets for roll, pitch, yaw
+        self.center_offsets = (0.0, 0.0, 0.0)  # Neutral offsets for roll, pitch, yaw
+        self._pwm_bases = (_PWM_MID,) * 4  # Per-axis PWM at zero input, offsets folded in
         self.prev_mode = None         # Flight mode prior to entering GUIDED
         self.last_override_time = 0   # Timestamp of last RC override send
-        self._last_joystick_retry = 0
+        self._override_dirty = False  # Sticks moved since the last override was sent
+        self._override_interval = 1.0 / OVERRIDE_RATE_HZ
+        self._set_override_rate(override_hz)
+        self._next_override_deadline = 0.0  # Next keepalive resend on the direct MAVLink path
+        self._next_joystick_retry = 0.0
         self._pygame_ready = False
+        self._prev_blocked = None     # Event types SDL blocked before the module filtered them
         self._auto_connect = auto_connect
         self._pg = pygame_module if pygame_module is not None else pygame
-        self._pending_mode_change = None
+        self._pending_mode = None     # Target of the in-flight mode change, if any
+        self._pending_mode_deadline = 0.0
         self._pending_mode_success = None
         self._pending_mode_failure = None
-        self._pending_mode_plan = []
-        self._pending_disarm_ack = None
+        self._pending_mode_plan = ()   # Fallback plan of the pending change...
+        self._pending_mode_plan_idx = 0  # ...and the index of its next entry
+        self._pending_disarm_stage = None  # "primary"/"fallback" while a disarm awaits its ACK
+        self._pending_disarm_deadline = 0.0
         self.manual_override_only = _coerce_bool(manual_override_only, False)
         self._joystick_state_msg = None
+        self._override_buf = [0] * 8  # RC override list shared with the rc module
+        self._override_cleared = False  # True once channels 1-4 were released
+        self._last_packed = None      # Last override sent, 16 bits per channel (roll..yaw)
+        self._last_axis_raw = [0.0] * 4  # Last forwarded raw value of axes 0-3
+        self._js_fd = None            # Linux joydev node read directly for axes/buttons
+        self._js_sel = None
+        self._js_axes = []            # Latest joydev axis values, scaled to -1..1
+        self._axis_source = None      # get_axis-style callable: joydev state or pygame
+        self._last_pump = 0
+        self._bound_master = None     # Connection the cached senders below belong to...
+        self._bound_mav = None        # ...and its MAVLink encoder, replaced on version detection
+        self._mav_send = None
+        self._override_msg = None     # Reused RC_CHANNELS_OVERRIDE for the direct MAVLink path
+        self._clear_msg = None
+        self._disarm_msg = None       # Reused COMMAND_LONG for the fallback disarm
+        self._mode_map = None         # Upper-cased mode_mapping() of _bound_master
+        self._mode_map_type = None    # master.mav_type the cached mapping was built for
+        # Button index -> bound handler, resolved once instead of an if/elif chain
+        self._btn_down = {
+            BTN_TRIGGER: self._on_trigger_down,
+            BTN_RTL: self._on_rtl,
+            BTN_DISARM: self._on_disarm,
+        }
+        self._btn_up = {BTN_TRIGGER: self._on_trigger_up}
+        # MAVLink message type -> handler; every other type is ignored in mavlink_packet
+        self._packet_handlers = {
+            "COMMAND_ACK": self._handle_command_ack,
+            "HEARTBEAT": self._on_heartbeat,
+        }
+        self.add_command('wingmav', self.cmd_wingmav, "WingMAV joystick control", ["rate"])
 
         # Initialize logging if enabled
         if self.log_enabled:
             try:
-                self.log_file = open(self.log_file_path, "a")
+                self.log_file = open(self.log_file_path, "a", buffering=8192)
+                self._log_thread = threading.Thread(
+                    target=self._log_writer, name="wingmav-log", daemon=True
+                )
+                self._log_thread.start()
                 self._log("Joystick control module started (file logging enabled).")
             except Exception as e:
-                print(f"JoystickCtrl: ERROR opening log file {self.log_file_path}: {e}")
+                print(f"{_LOG_PREFIX} ERROR opening log file {self.log_file_path}: {e}")
                 self.log_file = None
                 self.log_enabled = False
 
@@ -144,6 +282,11 @@ class JoystickControlModule(mp_module.MPModule):
 
         # Check for RC override module
         self.rc_module = self.module('rc')
+        self._override_period = getattr(self.rc_module, "override_period", None)
+        # The override transport is fixed for the module's lifetime; bind it once.
+        self._send_override_impl = (
+            self._send_via_rc_module if self.rc_module is not None else self._send_via_mavlink
+        )
         if self.rc_module is None:
             self._log("WARNING: 'rc' module not found. RC overrides will be sent directly via MAVLink.", error=True)
         else:
@@ -163,13 +306,45 @@ class JoystickControlModule(mp_module.MPModule):
         except Exception as e:
             self._log(f"Failed to initialize pygame joystick system: {e}", error=True)
             self._pygame_ready = False
-            if self.log_enabled and self.log_file:
-                try:
-                    self.log_file.close()
-                finally:
-                    self.log_file = None
-                    self.log_enabled = False
+            self._close_log_file()
             raise
+        self._restrict_event_types()
+
+    def _restrict_event_types(self):
+        """Have SDL drop every event type the module does not handle before it is queued."""
+        pg = self._pg
+        try:
+            # The filter is process-wide; remember what was blocked so unload() can restore it.
+            self._prev_blocked = [t for t in range(pg.NUMEVENTS) if pg.event.get_blocked(t)]
+        except Exception as e:
+            self._log(f"Could not read pygame event filter: {e}", error=True)
+            self._prev_blocked = []
+        try:
+            pg.event.set_blocked(None)
+            pg.event.set_allowed([
+                pg.JOYAXISMOTION,
+                pg.JOYBUTTONDOWN,
+                pg.JOYBUTTONUP,
+                pg.JOYDEVICEADDED,
+                pg.JOYDEVICEREMOVED,
+            ])
+        except Exception as e:
+            self._log(f"Could not restrict pygame event types: {e}", error=True)
+            return
+        self._sync_event_filter()
+
+    def _restore_event_filter(self):
+        """Give other pygame users back the event filter that was in place at load."""
+        if self._prev_blocked is None:
+            return
+        pg = self._pg
+        try:
+            pg.event.set_allowed(None)
+            if self._prev_blocked:
+                pg.event.set_blocked(self._prev_blocked)
+        except Exception as e:
+            self._log(f"Could not restore pygame event filter: {e}", error=True)
+        self._prev_blocked = None
 
     def ensure_pygame_ready(self):
         """Ensure pygame has been initialised. Intended for external callers."""
@@ -178,11 +353,11 @@ class JoystickControlModule(mp_module.MPModule):
         if self._pygame_ready and self._auto_connect and self.joystick is None:
             self._connect_joystick()
 
-    def _connect_joystick(self):
+    def _connect_joystick(self, now=None):
         """Connect to the first available joystick."""
         if not self._pygame_ready or self._pg is None:
             return False
-        self._last_joystick_retry = time.time()
+        self._next_joystick_retry = (now if now is not None else time.monotonic()) + 2.0
         count = self._pg.joystick.get_count()
         if count < 1:
             self._log_state_once("waiting", "Joystick ready; waiting for device.")
@@ -198,6 +373,8 @@ class JoystickControlModule(mp_module.MPModule):
             self._log_state_once(
                 "connected", f"Joystick connected: {name} ({axes} axes, {buttons} buttons)"
             )
+            self._axis_source = js.get_axis
+            self._open_joydev(name, axes)
             return True
         except Exception as e:
             self._log(f"Error initializing joystick: {e}", error=True)
@@ -210,6 +387,9 @@ class JoystickControlModule(mp_module.MPModule):
         Process joystick events and send RC override messages.
         This method is called frequently by MAVProxy.
         """
+        # One clock read per tick, shared by the retry and override timers below.
+        now = time.monotonic()
+
         # Always service asynchronous state machines first so pending mode/disarm
         # transitions continue even if pygame is unavailable.
         self._service_async_transitions()
@@ -218,110 +398,286 @@ class JoystickControlModule(mp_module.MPModule):
         if not self._pygame_ready or self._pg is None:
             return
 
-        for event in self._pg.event.get():
-            if event.type == self._pg.JOYBUTTONDOWN and self.joystick and event.joy == self.joy_id:
-                if event.button == BTN_TRIGGER:
-                    if not self.control_active:
-                        self._activate_control()
-                elif event.button == BTN_RTL:
-                    self._log("RTL button: requesting RTL mode")
-                    self._set_flight_mode(
-                        "RTL",
-                        success_msg="RTL button: RTL confirmed",
-                        pending_msg="RTL button: awaiting RTL ack",
-                        failure_msg="RTL button: RTL change failed",
-                    )
-                elif event.button == BTN_DISARM:
-                    self._log("Disarm button: sending disarm")
-                    self._disarm_vehicle()
-            elif event.type == self._pg.JOYBUTTONUP and self.joystick and event.joy == self.joy_id:
-                if event.button == BTN_TRIGGER:
-                    if self.control_active:
-                        self._deactivate_control()
-            elif event.type == self._pg.JOYAXISMOTION and self.joystick and event.joy == self.joy_id:
-                if self.control_active:
-                    self._send_override()
-            elif event.type == self._pg.JOYDEVICEADDED:
-                if self.joystick is None:
+        if self._js_sel is not None:
+            self._read_joydev(now)
+        # While joydev supplies axes and buttons, SDL is only pumped for hotplug events.
+        if self._js_sel is None or now - self._last_pump >= INPUT_PUMP_INTERVAL:
+            self._last_pump = now
+            self._drain_events(now)
+
+        if self.joystick is None and now >= self._next_joystick_retry:
+            self._connect_joystick(now)
+
+        # Stick-driven sends are capped at the configured rate; later moves stay dirty.
+        if (
+            self._override_dirty
+            and self.control_active
+            and now - self.last_override_time >= self._override_interval
+        ):
+            self._override_dirty = False
+            self._send_override(now=now)
+
+        # Without the rc module nothing else repeats the override, so resend it at
+        # DIRECT_OVERRIDE_PERIOD even when the sticks have not moved.
+        if self.control_active and self.rc_module is None and now >= self._next_override_deadline:
+            self._send_override(force=True, now=now)
+
+        # Run async transitions again in case the work above queued new requests.
+        self._service_async_transitions()
+
+    def _drain_events(self, now):
+        """Handle every queued pygame event (buttons, axes, hotplug)."""
+        # Axis motion only marks the sticks dirty; a burst of JOYAXISMOTION events
+        # is folded into a single override sent after the queue is drained.
+        pg = self._pg
+        JOYAXISMOTION = pg.JOYAXISMOTION
+        JOYBUTTONDOWN = pg.JOYBUTTONDOWN
+        JOYBUTTONUP = pg.JOYBUTTONUP
+        JOYDEVICEADDED = pg.JOYDEVICEADDED
+        JOYDEVICEREMOVED = pg.JOYDEVICEREMOVED
+        btn_down = self._btn_down
+        btn_up = self._btn_up
+        last_axis_raw = self._last_axis_raw
+        # Only hotplug handling changes these, so they are re-read after it.
+        js = self.joystick
+        joy_id = self.joy_id
+        axes_dirty = False
+        # Axis motion is by far the most frequent event, so it is tested first.
+        for event in pg.event.get():
+            etype = event.type
+            if etype == JOYAXISMOTION:
+                if js is not None and event.joy == joy_id:
+                    axis = event.axis
+                    if axis < 4:
+                        if abs(event.value - last_axis_raw[axis]) < AXIS_EPSILON:
+                            continue
+                        last_axis_raw[axis] = event.value
+                    axes_dirty = True
+            elif etype == JOYBUTTONDOWN:
+                if js is not None and event.joy == joy_id:
+                    handler = btn_down.get(event.button)
+                    if handler:
+                        handler()
+            elif etype == JOYBUTTONUP:
+                if js is not None and event.joy == joy_id:
+                    handler = btn_up.get(event.button)
+                    if handler:
+                        handler()
+            elif etype == JOYDEVICEADDED:
+                if js is None:
                     self._log("Joystick added; initializing.")
                     self._connect_joystick()
-            elif event.type == self._pg.JOYDEVICEREMOVED:
-                if self.joystick and event.joy == self.joy_id:
+                    js = self.joystick
+                    joy_id = self.joy_id
+            elif etype == JOYDEVICEREMOVED:
+                if js is not None and event.joy == joy_id:
                     self._handle_disconnection()
+                    js = self.joystick
+                    joy_id = self.joy_id
 
-        if self.joystick is None and time.time() - self._last_joystick_retry > 2.0:
-            self._last_joystick_retry = time.time()
-            self._connect_joystick()
+        if axes_dirty:
+            self._override_dirty = True
 
-        # If no rc module, throttle direct override sending to ~10 Hz
-        if self.control_active and self.rc_module is None:
-            if time.time() - self.last_override_time > 0.1:
-                self._send_override()
+    def _set_override_rate(self, hz):
+        """Set the stick-driven override cap; invalid or non-positive values keep the current rate."""
+        if hz is None:
+            return True
+        try:
+            rate = float(hz)
+        except (TypeError, ValueError):
+            rate = 0.0
+        if not rate > 0:
+            self._log(f"Ignoring invalid override rate {hz!r}", error=True)
+            return False
+        self._override_interval = 1.0 / rate
+        return True
 
-        # Run async transitions again in case the work above queued new requests.
-        self._service_async_transitions()
+    def cmd_wingmav(self, args):
+        """Handle the ``wingmav`` console command."""
+        if args and args[0] == "rate":
+            if len(args) > 1 and self._set_override_rate(args[1]):
+                self._log(f"RC override rate set to {1.0 / self._override_interval:g} Hz")
+            elif len(args) == 1:
+                self._log(f"RC override rate: {1.0 / self._override_interval:g} Hz")
+            return
+        print("usage: wingmav rate [HZ]")
+
+    def _on_trigger_down(self):
+        if not self.control_active:
+            self._activate_control()
+
+    def _on_trigger_up(self):
+        if self.control_active:
+            self._deactivate_control()
+
+    def _on_rtl(self):
+        self._announce("RTL button: requesting RTL mode")
+        self._set_flight_mode(
+            _RTL,
+            success_msg="RTL button: RTL confirmed",
+            pending_msg="RTL button: awaiting RTL ack",
+            failure_msg="RTL button: RTL change failed",
+        )
+
+    def _on_disarm(self):
+        self._announce("Disarm button: sending disarm")
+        self._disarm_vehicle()
+
+    def _open_joydev(self, name, num_axes):
+        """Read the joydev node matching ``name`` directly instead of pumping SDL each tick."""
+        self._close_joydev()
+        if not sys.platform.startswith("linux"):
+            return
+        matches = []
+        for path in glob.glob("/sys/class/input/js*/device/name"):
+            try:
+                with open(path) as fh:
+                    if fh.read().strip() == name:
+                        matches.append(path.split("/")[4])
+            except OSError:
+                continue
+        if len(matches) != 1:
+            return  # unknown or ambiguous mapping; keep using pygame events
+        try:
+            fd = os.open(f"/dev/input/{matches[0]}", os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            return
+        self._js_fd = fd
+        self._js_sel = selectors.DefaultSelector()
+        self._js_sel.register(fd, selectors.EVENT_READ)
+        # The kernel replays the current state as JS_EVENT_INIT records right after open.
+        self._js_axes = [0.0] * max(num_axes, len(self._axis_indices))
+        self._axis_source = self._js_axes.__getitem__
+        self._sync_event_filter()
+
+    def _close_joydev(self):
+        if self._js_sel is not None:
+            self._js_sel.close()
+            self._js_sel = None
+        if self._js_fd is None:
+            return
+        try:
+            os.close(self._js_fd)
+        except OSError:
+            pass
+        self._js_fd = None
+        self._axis_source = self.joystick.get_axis if self.joystick is not None else None
+        self._sync_event_filter()
+
+    def _sync_event_filter(self):
+        """Let SDL queue only the joystick events the module currently consumes.
+
+        Buttons are dropped while joydev delivers them. Axis motion is also dropped
+        while control is off: centring and sends read the axis state directly, which
+        SDL keeps current even for blocked events.
+        """
+        pg = self._pg
+        buttons = [pg.JOYBUTTONDOWN, pg.JOYBUTTONUP]
+        try:
+            if self._js_fd is None:
+                pg.event.set_allowed(buttons)
+            else:
+                pg.event.set_blocked(buttons)
+            if self._js_fd is None and self.control_active:
+                pg.event.set_allowed(pg.JOYAXISMOTION)
+            else:
+                pg.event.set_blocked(pg.JOYAXISMOTION)
+                pg.event.clear(pg.JOYAXISMOTION)
+        except Exception as e:
+            self._log(f"Could not update pygame joystick event filter: {e}", error=True)
+
+    def _read_joydev(self, now):
+        """Apply every pending js_event record; axis changes coalesce into one override."""
+        if not self._js_sel.select(0):
+            return
+        chunks = []
+        try:
+            while True:
+                data = os.read(self._js_fd, _JS_EVENT.size * 64)
+                if not data:
+                    raise OSError("joydev node closed")
+                chunks.append(data)
+        except BlockingIOError:
+            pass
+        except OSError:
+            # Device gone; fall back to pygame, which reports the removal when pumped.
+            self._close_joydev()
+        data = b"".join(chunks)
+        data = data[:len(data) - len(data) % _JS_EVENT.size]
+        axes = self._js_axes
+        num_axes = len(axes)
+        last_axis_raw = self._last_axis_raw
+        btn_down = self._btn_down
+        btn_up = self._btn_up
+        axes_dirty = False
+        for _ts, value, etype, number in _JS_EVENT.iter_unpack(data):
+            if etype & _JS_EVENT_AXIS:
+                if number < num_axes:
+                    value /= 32767.0
+                    axes[number] = value
+                    if number < 4 and abs(value - last_axis_raw[number]) >= AXIS_EPSILON:
+                        last_axis_raw[number] = value
+                        axes_dirty = True
+            elif etype & _JS_EVENT_BUTTON and not etype & _JS_EVENT_INIT:
+                # Initial button state is not a press, matching pygame on connect.
+                handler = (btn_down if value else btn_up).get(number)
+                if handler:
+                    handler()
+        if axes_dirty:
+            self._override_dirty = True
 
     def _service_async_transitions(self):
-        self._check_pending_mode_change()
-        self._process_disarm_ack()
+        # Guard here so the common nothing-pending tick costs no extra calls.
+        if self._pending_mode is not None:
+            self._check_pending_mode_change()
+        if self._pending_disarm_stage is not None:
+            self._process_disarm_ack()
 
     def _activate_control(self):
         """Activate joystick control: save neutral offsets, switch to GUIDED mode, and begin RC override."""
         self.prev_mode = self.status.flightmode
         try:
-            self.center_offsets[0] = self.joystick.get_axis(AXIS_ROLL)
-            self.center_offsets[1] = self.joystick.get_axis(AXIS_PITCH)
-            self.center_offsets[2] = self.joystick.get_axis(AXIS_YAW)
+            self.center_offsets = tuple(map(self._axis_source, self._axis_indices[:3]))
         except Exception as e:
             self._log(f"ERROR reading joystick axes for centering: {e}", error=True)
             return
+        self._pwm_bases = tuple(_PWM_MID - o * _PWM_SCALE for o in self.center_offsets) + (_PWM_MID,)
         if self.manual_override_only:
-            self._log("Trigger pressed: control on (mode unchanged)")
+            self._announce("Trigger pressed: control on (mode unchanged)")
         else:
             self._set_flight_mode(
-                "GUIDED",
+                _GUIDED,
                 success_msg="Trigger pressed: GUIDED and control on",
                 pending_msg="Trigger pressed: awaiting GUIDED ack",
                 failure_msg="Trigger pressed: GUIDED change failed; staying put",
             )
         self.control_active = True
+        self._sync_event_filter()
         self._send_override(force=True)
 
     def _deactivate_control(self):
         """Deactivate joystick control: clear overrides and revert to previous or safe flight mode."""
         self.control_active = False
+        self._sync_event_filter()
         self._clear_rc_override()
         if self.manual_override_only:
-            self._log("Trigger released: control off (mode unchanged)")
+            self._announce("Trigger released: control off (mode unchanged)")
             return
-        target_mode = self.prev_mode if self.prev_mode else "LOITER"
-        plan = [
-            {
-                "mode": target_mode,
-                "success_msg": f"Trigger released: control off; now in {target_mode}",
-                "pending_msg": f"Trigger released: awaiting {target_mode} ack",
-                "failure_msg": f"Trigger released: {target_mode} failed; trying LOITER",
-            },
-            {
-                "mode": "LOITER",
-                "success_msg": "Trigger released: control off; LOITER active",
-                "pending_msg": "Trigger released: awaiting LOITER ack",
-                "failure_msg": "LOITER fallback failed; trying STABILIZE",
-            },
-            {
-                "mode": "STABILIZE",
-                "success_msg": "Trigger released: control off; STABILIZE active",
-                "pending_msg": "Trigger released: awaiting STABILIZE ack",
-                "failure_msg": "Trigger released: control off; mode unchanged!",
-            },
-        ]
-        self._attempt_mode_sequence(plan)
+        target_mode = self.prev_mode if self.prev_mode else _LOITER
+        self._set_flight_mode(
+            target_mode,
+            success_msg=f"Trigger released: control off; now in {target_mode}",
+            pending_msg=f"Trigger released: awaiting {target_mode} ack",
+            failure_msg=f"Trigger released: {target_mode} failed; trying LOITER",
+            fallback_plan=_RELEASE_FALLBACK_PLAN,
+        )
 
     def _handle_disconnection(self):
         """Handle joystick disconnection by clearing control and switching to safe mode."""
-        self._log_state_once("disconnected", "Joystick disconnected.", error=True)
+        self._log_state_once("disconnected", "Joystick disconnected.", error=True, announce=True)
         if self.control_active:
             self.control_active = False
+            self._sync_event_filter()
             self._clear_rc_override()
             if self.manual_override_only:
                 self._log(
@@ -330,21 +686,26 @@ class JoystickControlModule(mp_module.MPModule):
                 )
             else:
                 self._set_flight_mode(
-                    "LOITER",
+                    _LOITER,
                     success_msg="Joystick active; LOITER for safety.",
                     pending_msg="Joystick active; waiting for LOITER ack.",
                     failure_msg="Joystick active; LOITER change failed.",
                 )
+        self._close_joydev()
         self.joystick = None
         self.joy_id = None
+        self._axis_source = None
 
-    def _log_state_once(self, state, message, *, error=False):
+    def _log_state_once(self, state, message, *, error=False, announce=False):
         if self._joystick_state_msg == state:
             return
         self._joystick_state_msg = state
-        self._log(message, error=error)
+        if announce:
+            self._announce(message, error=error)
+        else:
+            self._log(message, error=error)
 
-    def _send_override(self, force=False):
+    def _send_override(self, force=False, now=None):
         """
         Read current joystick values, apply centering offsets, and send RC override messages.
         Maps deflections to PWM values for RC channels (roll, pitch, throttle, yaw).
@@ -352,150 +713,192 @@ class JoystickControlModule(mp_module.MPModule):
         if self.joystick is None:
             return
         try:
-            roll_in     = self.joystick.get_axis(AXIS_ROLL)
-            pitch_in    = self.joystick.get_axis(AXIS_PITCH)
-            yaw_in      = self.joystick.get_axis(AXIS_YAW)
-            throttle_in = self.joystick.get_axis(AXIS_THROTTLE)
+            roll_in, pitch_in, yaw_in, throttle_in = map(self._axis_source, self._axis_indices)
         except Exception as e:
             self._log(f"ERROR reading joystick axes for override: {e}", error=True)
             return
 
-        roll_deflect  = roll_in  - self.center_offsets[0]
-        pitch_deflect = pitch_in - self.center_offsets[1]
-        yaw_deflect   = yaw_in   - self.center_offsets[2]
-
-        roll_pwm     = int(1500 + (roll_deflect  * 500))
-        pitch_pwm    = int(1500 + (pitch_deflect * 500))
-        yaw_pwm      = int(1500 + (yaw_deflect   * 500))
-        throttle_pwm = int(1500 + (throttle_in * 500))
-        roll_pwm     = max(1000, min(2000, roll_pwm))
-        pitch_pwm    = max(1000, min(2000, pitch_pwm))
-        yaw_pwm      = max(1000, min(2000, yaw_pwm))
-        throttle_pwm = max(1000, min(2000, throttle_pwm))
-
-        pwm_values = (roll_pwm, pitch_pwm, throttle_pwm, yaw_pwm)
-        if not force and hasattr(self, "_last_pwm_values"):
-            if pwm_values == self._last_pwm_values:
+        # Centre offsets are folded into _pwm_bases when control engages.
+        roll_base, pitch_base, yaw_base, throttle_base = self._pwm_bases
+        roll_pwm     = _clamp_pwm(roll_base     + roll_in     * _PWM_SCALE)
+        pitch_pwm    = _clamp_pwm(pitch_base    + pitch_in    * _PWM_SCALE)
+        yaw_pwm      = _clamp_pwm(yaw_base      + yaw_in      * _PWM_SCALE)
+        throttle_pwm = _clamp_pwm(throttle_base + throttle_in * _PWM_SCALE)
+
+        # Pack the channels so an unchanged stick costs a single int compare; the
+        # per-channel deadband test only unpacks lanes when something moved.
+        packed = roll_pwm | pitch_pwm << 16 | throttle_pwm << 32 | yaw_pwm << 48
+        last = self._last_packed
+        if not force and last is not None:
+            if packed == last:
                 return
-        self._last_pwm_values = pwm_values
-        if self.rc_module:
-            override_source = self.rc_module.override
-            if override_source is None:
-                override_list = [0] * 8
-            else:
-                override_list = list(override_source)
-            if len(override_list) < 8:
-                override_list.extend([0] * (8 - len(override_list)))
-            override_list[0] = roll_pwm
-            override_list[1] = pitch_pwm
-            override_list[2] = throttle_pwm
-            override_list[3] = yaw_pwm
-            try:
-                self.rc_module.override = override_list
-            except Exception as e:
-                self._log(f"Failed to apply RC override via rc module: {e}", error=True)
+            if (
+                abs(roll_pwm - (last & 0xFFFF)) <= PWM_DEADBAND
+                and abs(pitch_pwm - (last >> 16 & 0xFFFF)) <= PWM_DEADBAND
+                and abs(throttle_pwm - (last >> 32 & 0xFFFF)) <= PWM_DEADBAND
+                and abs(yaw_pwm - (last >> 48)) <= PWM_DEADBAND
+            ):
                 return
-            if hasattr(self.rc_module, "override_period"):
-                self.rc_module.override_period.force()
-        else:
-            self.master.mav.rc_channels_override_send(
-                self.master.target_system,
-                self.master.target_component,
-                roll_pwm, pitch_pwm, throttle_pwm, yaw_pwm,
-                0, 0, 0, 0
+        self._last_packed = packed
+        if not self._send_override_impl(roll_pwm, pitch_pwm, throttle_pwm, yaw_pwm):
+            return
+        self._override_cleared = False
+        if now is None:
+            now = time.monotonic()
+        self.last_override_time = now
+        self._next_override_deadline = now + DIRECT_OVERRIDE_PERIOD
+
+    def _send_via_rc_module(self, roll, pitch, throttle, yaw):
+        """Hand channels 1-4 to the rc module, which owns the resend cadence."""
+        try:
+            self._write_rc_override(roll, pitch, throttle, yaw)
+        except Exception as e:
+            self._log(f"Failed to apply RC override via rc module: {e}", error=True)
+            return False
+        if self._override_period is not None:
+            self._override_period.force()
+        return True
+
+    def _send_via_mavlink(self, roll, pitch, throttle, yaw):
+        """Send RC_CHANNELS_OVERRIDE directly on the master link."""
+        master = self._bind_master()
+        msg = self._override_msg
+        msg.target_system = master.target_system
+        msg.target_component = master.target_component
+        msg.chan1_raw = roll
+        msg.chan2_raw = pitch
+        msg.chan3_raw = throttle
+        msg.chan4_raw = yaw
+        self._mav_send(msg)
+        return True
+
+    def _bind_master(self):
+        """Return the active master, rebuilding cached senders and messages if it changed.
+
+        pymavlink swaps ``master.mav`` when it detects the link's MAVLink version,
+        so a new encoder counts as a change too.
+        """
+        master = self.master
+        mav = master.mav
+        if master is not self._bound_master or mav is not self._bound_mav:
+            self._mav_send = mav.send
+            self._override_msg = mavutil.mavlink.MAVLink_rc_channels_override_message(
+                master.target_system, master.target_component, 0, 0, 0, 0, 0, 0, 0, 0
             )
-        self.last_override_time = time.time()
+            self._clear_msg = mavutil.mavlink.MAVLink_rc_channels_override_message(
+                master.target_system, master.target_component, 0, 0, 0, 0, 0, 0, 0, 0
+            )
+            self._disarm_msg = mavutil.mavlink.MAVLink_command_long_message(
+                master.target_system, master.target_component, _CMD_ARM_DISARM, 0, 0, 0, 0, 0, 0, 0, 0
+            )
+            self._mode_map = None
+            self._bound_master = master
+            self._bound_mav = mav
+        return master
+
+    def _mode_mapping(self):
+        """Return the master's mode mapping keyed by upper-case name, cached per link and vehicle type."""
+        master = self._bind_master()
+        mav_type = getattr(master, "mav_type", None)
+        if self._mode_map is None or mav_type != self._mode_map_type:
+            mapping = master.mode_mapping()
+            if mapping is None:
+                return None  # vehicle type not known yet; retry on the next request
+            self._mode_map = {name.upper(): mode_id for name, mode_id in mapping.items()}
+            self._mode_map_type = mav_type
+        return self._mode_map
 
-    def _clear_rc_override(self):
+    def _write_rc_override(self, roll, pitch, throttle, yaw):
+        """Update channels 1-4 of the rc module's override list in place."""
+        buf = self._override_buf
+        source = self.rc_module.override
+        if source is not buf:
+            # Adopt the rc module's current list (channels 5+ may be set by other
+            # commands) into the shared buffer, padded to at least 8 channels.
+            buf[:] = source if source is not None else ()
+            if len(buf) < 8:
+                buf.extend([0] * (8 - len(buf)))
+        buf[0] = roll
+        buf[1] = pitch
+        buf[2] = throttle
+        buf[3] = yaw
+        if source is not buf:
+            self.rc_module.override = buf
+
+    def _clear_rc_override(self, force=False):
         """Clear any RC override by setting channels 1-4 to 0 (no override)."""
+        if self._override_cleared and not force:
+            return
         if self.rc_module:
-            override_source = self.rc_module.override
-            if override_source is None:
-                override_list = [0] * 8
-            else:
-                override_list = list(override_source)
-            if len(override_list) < 8:
-                override_list.extend([0] * (8 - len(override_list)))
-            override_list[0] = 0
-            override_list[1] = 0
-            override_list[2] = 0
-            override_list[3] = 0
             try:
-                self.rc_module.override = override_list
+                self._write_rc_override(0, 0, 0, 0)
             except Exception as e:
                 self._log(f"Failed to clear RC override via rc module: {e}", error=True)
                 return
-            if hasattr(self.rc_module, "override_period"):
-                self.rc_module.override_period.force()
+            if self._override_period is not None:
+                self._override_period.force()
         else:
             try:
-                self.master.mav.rc_channels_override_send(
-                    self.master.target_system,
-                    self.master.target_component,
-                    0, 0, 0, 0, 0, 0, 0, 0
-                )
+                master = self._bind_master()
+                msg = self._clear_msg
+                msg.target_system = master.target_system
+                msg.target_component = master.target_component
+                self._mav_send(msg)
             except Exception as e:
                 self._log(f"ERROR clearing RC override: {e}", error=True)
+                return
+        self._override_cleared = True
 
-    def _clone_mode_plan(self, plan):
-        return [
-            {
-                "mode": entry.get("mode"),
-                "success_msg": entry.get("success_msg"),
-                "pending_msg": entry.get("pending_msg"),
-                "failure_msg": entry.get("failure_msg"),
-            }
-            for entry in (plan or [])
-            if entry.get("mode")
-        ]
-
-    def _attempt_mode_sequence(self, plan):
-        plan_copy = self._clone_mode_plan(plan)
-        if not plan_copy:
-            return False
-        first = plan_copy.pop(0)
-        return self._set_flight_mode(
-            first["mode"],
-            success_msg=first.get("success_msg"),
-            pending_msg=first.get("pending_msg"),
-            failure_msg=first.get("failure_msg"),
-            fallback_plan=plan_copy,
-        )
-
-    def _start_next_mode_from_plan(self, plan, previous_failure_msg=None):
+    def _start_next_mode_from_plan(self, plan, start, previous_failure_msg=None):
+        """Request ``plan[start]``; plans are immutable tuples, so only the index advances."""
+        has_next = start < len(plan)
         if previous_failure_msg:
-            self._log(previous_failure_msg, error=True)
-        if not plan:
+            # The last failure in a plan is a user-level outcome; earlier ones are progress.
+            if has_next:
+                self._log(previous_failure_msg, error=True)
+            else:
+                self._announce(previous_failure_msg, error=True)
+        if not has_next:
             return False
-        next_entry = plan[0]
-        remaining = self._clone_mode_plan(plan[1:])
+        mode, success_msg, pending_msg, failure_msg = plan[start]
         return self._set_flight_mode(
-            next_entry.get("mode"),
-            success_msg=next_entry.get("success_msg"),
-            pending_msg=next_entry.get("pending_msg"),
-            failure_msg=next_entry.get("failure_msg"),
-            fallback_plan=remaining,
+            mode,
+            success_msg=success_msg,
+            pending_msg=pending_msg,
+            failure_msg=failure_msg,
+            fallback_plan=plan,
+            fallback_start=start + 1,
         )
 
     def _clear_pending_mode_change(self):
-        self._pending_mode_change = None
+        self._pending_mode = None
         self._pending_mode_success = None
         self._pending_mode_failure = None
-        self._pending_mode_plan = []
+        self._pending_mode_plan = ()
+        self._pending_mode_plan_idx = 0
 
-    def _set_flight_mode(self, mode_name, *, success_msg=None, pending_msg=None, failure_msg=None, fallback_plan=None):
-        """Request a flight mode change without blocking the event loop."""
-        fallback_plan = self._clone_mode_plan(fallback_plan)
+    def _set_flight_mode(
+        self,
+        mode_name,
+        *,
+        success_msg=None,
+        pending_msg=None,
+        failure_msg=None,
+        fallback_plan=(),
+        fallback_start=0,
+    ):
+        """Request a flight mode change without blocking the event loop.
+
+        On failure the entries of ``fallback_plan`` from ``fallback_start`` on are tried in order.
+        """
         if not mode_name:
-            return self._start_next_mode_from_plan(fallback_plan, failure_msg)
-        mode_name = mode_name.upper()
+            return self._start_next_mode_from_plan(fallback_plan, fallback_start, failure_msg)
+        mode_name = _canonical_mode(mode_name)
 
-        existing = self._pending_mode_change
-        existing_mode = None
+        existing_mode = self._pending_mode
         cancelled_pending_msg = None
-        if existing:
-            existing_mode = existing.get("mode")
-            if existing_mode == mode_name:
+        if existing_mode is not None:
+            if existing_mode is mode_name:
                 if pending_msg:
                     self._log(pending_msg)
                 return None
@@ -504,85 +907,86 @@ class JoystickControlModule(mp_module.MPModule):
             )
 
         try:
-            mode_mapping = self.master.mode_mapping()
+            mode_mapping = self._mode_mapping()
         except Exception as e:
             self._log(f"Unable to retrieve mode mapping: {e}", error=True)
-            return self._start_next_mode_from_plan(fallback_plan, failure_msg)
+            return self._start_next_mode_from_plan(fallback_plan, fallback_start, failure_msg)
+        if mode_mapping is not None and mode_name not in mode_mapping:
+            # The cached table may predate the vehicle's full mode list; rebuild it once.
+            self._mode_map = None
+            try:
+                mode_mapping = self._mode_mapping()
+            except Exception:
+                mode_mapping = None
         if mode_mapping is None or mode_name not in mode_mapping:
             self._log(f"Flight mode '{mode_name}' not recognized or not supported", error=True)
-            return self._start_next_mode_from_plan(fallback_plan, failure_msg)
+            return self._start_next_mode_from_plan(fallback_plan, fallback_start, failure_msg)
         mode_id = mode_mapping[mode_name]
-        current_mode = (self.status.flightmode or "").upper()
-        if current_mode == mode_name:
+        current_mode = self.status.flightmode
+        if current_mode and _canonical_mode(current_mode) is mode_name:
             if success_msg:
-                self._log(success_msg)
+                self._announce(success_msg)
             self._clear_pending_mode_change()
             return True
         try:
             self.master.set_mode(mode_id)
         except Exception as e:
             self._log(f"Failed to send mode change to {mode_name}: {e}", error=True)
-            if existing:
-                self._log(
-                    "Continuing to monitor previously pending flight mode change"
-                    + (f" to {existing_mode}" if existing_mode else "")
-                    + ".",
-                )
+            if existing_mode is not None:
+                self._log(f"Continuing to monitor previously pending flight mode change to {existing_mode}.")
                 return False
-            return self._start_next_mode_from_plan(fallback_plan, failure_msg)
+            return self._start_next_mode_from_plan(fallback_plan, fallback_start, failure_msg)
         if cancelled_pending_msg:
             self._log(cancelled_pending_msg)
             self._clear_pending_mode_change()
-        self._pending_mode_change = {
-            "mode": mode_name,
-            "deadline": time.time() + 5.0,
-        }
+        self._pending_mode = mode_name
+        self._pending_mode_deadline = time.monotonic() + 5.0
         self._pending_mode_success = success_msg
         self._pending_mode_failure = failure_msg
         self._pending_mode_plan = fallback_plan
+        self._pending_mode_plan_idx = fallback_start
         if pending_msg:
             self._log(pending_msg)
         return None
 
     def _check_pending_mode_change(self):
-        if not self._pending_mode_change:
+        target = self._pending_mode
+        if target is None:
             return
-        target = self._pending_mode_change.get("mode")
-        current_mode = (self.status.flightmode or "").upper()
-        if current_mode == target:
+        current_mode = self.status.flightmode
+        if current_mode and _canonical_mode(current_mode) is target:
             if self._pending_mode_success:
-                self._log(self._pending_mode_success)
+                self._announce(self._pending_mode_success)
             else:
-                self._log(f"Flight mode change to {target} confirmed.")
+                self._announce(f"Flight mode change to {target} confirmed.")
             self._clear_pending_mode_change()
             return
-        if time.time() < self._pending_mode_change.get("deadline", 0):
+        if time.monotonic() < self._pending_mode_deadline:
             return
         failure_msg = self._pending_mode_failure or f"Timed out waiting for confirmation of mode change to {target}"
         plan = self._pending_mode_plan
+        start = self._pending_mode_plan_idx
         self._clear_pending_mode_change()
-        if plan:
-            self._start_next_mode_from_plan(plan, failure_msg)
+        if start < len(plan):
+            self._start_next_mode_from_plan(plan, start, failure_msg)
         else:
-            self._log(failure_msg, error=True)
+            self._announce(failure_msg, error=True)
 
     def _disarm_vehicle(self):
         """Send disarm command to the vehicle without blocking the event loop."""
-        if self._pending_disarm_ack:
+        if self._pending_disarm_stage is not None:
             self._log("Disarm command already in progress; awaiting acknowledgement.")
             return
         if self._send_primary_disarm():
-            self._pending_disarm_ack = {
-                "stage": "primary",
-                "deadline": time.time() + 2.0,
-            }
+            self._await_disarm_ack("primary")
         else:
             if self._send_fallback_disarm():
                 self._log("Primary disarm command failed; issued fallback disarm command.", error=True)
-                self._pending_disarm_ack = {
-                    "stage": "fallback",
-                    "deadline": time.time() + 2.0,
-                }
+                self._await_disarm_ack("fallback")
+
+    def _await_disarm_ack(self, stage):
+        self._pending_disarm_stage = stage
+        self._pending_disarm_deadline = time.monotonic() + 2.0
 
     def _send_primary_disarm(self):
         try:
@@ -594,105 +998,151 @@ class JoystickControlModule(mp_module.MPModule):
 
     def _send_fallback_disarm(self):
         try:
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
-                0,
-                0, 0, 0, 0, 0, 0, 0
-            )
+            master = self._bind_master()
+            msg = self._disarm_msg
+            msg.target_system = master.target_system
+            msg.target_component = master.target_component
+            self._mav_send(msg)
             return True
         except Exception as e:
             self._log(f"ERROR: Disarm command failed: {e}", error=True)
             return False
 
     def _process_disarm_ack(self):
-        pending = self._pending_disarm_ack
-        if not pending:
+        stage = self._pending_disarm_stage
+        if stage is None:
             return
-        if time.time() <= pending.get("deadline", 0):
+        if time.monotonic() <= self._pending_disarm_deadline:
             return
-        if pending.get("stage") == "primary":
+        if stage == "primary":
             self._log("Primary disarm command sent but not acknowledged; attempting fallback.", error=True)
             if self._send_fallback_disarm():
-                self._pending_disarm_ack = {
-                    "stage": "fallback",
-                    "deadline": time.time() + 2.0,
-                }
+                self._await_disarm_ack("fallback")
             else:
-                self._pending_disarm_ack = None
+                self._pending_disarm_stage = None
         else:
             self._log("Fallback disarm command did not receive acknowledgement.", error=True)
-            self._pending_disarm_ack = None
+            self._pending_disarm_stage = None
 
     def mavlink_packet(self, msg):
-        msg_type = msg.get_type()
-        if msg_type == "COMMAND_ACK":
-            self._handle_command_ack(msg)
-        elif msg_type == "HEARTBEAT":
+        handler = self._packet_handlers.get(msg.get_type())
+        if handler:
+            handler(msg)
+
+    def _on_heartbeat(self, msg):
+        if self._pending_mode is not None:
             self._check_pending_mode_change()
 
     def _handle_command_ack(self, msg):
-        if getattr(msg, "command", None) != mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+        if getattr(msg, "command", None) != _CMD_ARM_DISARM:
             return
-        pending = self._pending_disarm_ack
-        if not pending:
+        stage = self._pending_disarm_stage
+        if stage is None:
             return
         result = getattr(msg, "result", None)
-        if result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-            self._log("Disarm command acknowledged by vehicle.")
-            self._pending_disarm_ack = None
+        if result == _RESULT_ACCEPTED:
+            self._announce("Disarm command acknowledged by vehicle.")
+            self._pending_disarm_stage = None
             return
-        self._log(f"Disarm command rejected with MAV_RESULT {result}", error=True)
-        if pending.get("stage") == "primary":
+        self._announce(f"Disarm command rejected with MAV_RESULT {result}", error=True)
+        if stage == "primary":
             if self._send_fallback_disarm():
                 self._log(
                     "Primary disarm command rejected; issued fallback disarm command.",
                     error=True,
                 )
-                self._pending_disarm_ack = {
-                    "stage": "fallback",
-                    "deadline": time.time() + 2.0,
-                }
+                self._await_disarm_ack("fallback")
             else:
-                self._pending_disarm_ack = None
+                self._pending_disarm_stage = None
         else:
-            self._pending_disarm_ack = None
+            self._pending_disarm_stage = None
 
     def _log(self, message, error=False):
         """
         Log a message to the MAVProxy console and (optionally) to a file.
         """
-        prefix = "JoystickCtrl:"
-        if error:
-            prefix = "JoystickCtrl [WARN]:"
-        log_msg = f"{prefix} {message}"
-        print(log_msg)
+        print(f"{_WARN_PREFIX if error else _LOG_PREFIX} {message}")
+        if self.log_enabled and self.log_file:
+            sec = int(time.time())
+            if sec != self._ts_cached_sec:
+                self._ts_cached_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+                self._ts_cached_sec = sec
+            timestamp = self._ts_cached_str
+            # The writer thread owns the file, so a slow disk never stalls idle_task.
+            queue = self._log_q
+            queue.append(f"[{timestamp}] {message}\n")
+            if error or len(queue) >= LOG_FLUSH_LINES:
+                self._log_wake.set()
+
+    def _log_writer(self):
+        """Background thread: write queued log lines in batches, one flush per batch."""
+        queue = self._log_q
+        log_file = self.log_file
+        while True:
+            self._log_wake.wait(LOG_FLUSH_INTERVAL)
+            self._log_wake.clear()
+            stopping = self._log_stop
+            lines = []
+            while queue:
+                lines.append(queue.popleft())
+            if lines:
+                try:
+                    log_file.write("".join(lines))
+                    log_file.flush()
+                except Exception:
+                    pass
+            if stopping:
+                return
+
+    def _close_log_file(self):
+        """Drain the writer thread, then close the log file and disable file logging."""
+        if self._log_thread is not None:
+            self._log_stop = True
+            self._log_wake.set()
+            self._log_thread.join(timeout=2.0)
+            stalled = self._log_thread.is_alive()
+            self._log_thread = None
+            if stalled:
+                # Leave the file to the daemon writer rather than close it mid-write.
+                self.log_file = None
+                self.log_enabled = False
+                return
+        if self.log_enabled and self.log_file:
+            try:
+                self.log_file.close()
+            finally:
+                self.log_file = None
+                self.log_enabled = False
+
+    def _announce(self, message, error=False):
+        """
+        Log a user-level transition and also pass it to MAVProxy's say() (TTS).
+        """
+        self._log(message, error=error)
+        prefix = _WARN_PREFIX if error else _LOG_PREFIX
         try:
-            self.say(text=log_msg, priority='important' if error else 'normal')
+            self.say(text=f"{prefix} {message}", priority='important' if error else 'normal')
         except Exception:
             pass
-        if self.log_enabled and self.log_file:
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-            self.log_file.write(f"[{timestamp}] {message}\n")
-            self.log_file.flush()
 
     def unload(self):
         """
-        Clean up on module unload: quit the joystick and close log file.
+        Clean up on module unload: quit the joystick, restore the pygame event
+        filter and close log file.
         """
         if self.joystick:
             try:
                 self.joystick.quit()
             except Exception:
                 pass
+        self._close_joydev()
+        self._restore_event_filter()
+        try:
+            self.remove_command('wingmav')
+        except Exception:
+            pass
         self._log("Joystick control module unloaded.")
-        if self.log_enabled and self.log_file:
-            try:
-                self.log_file.close()
-            finally:
-                self.log_file = None
-                self.log_enabled = False
+        self._close_log_file()
 
 def init(mpstate, **kwargs):
     """Factory used by MAVProxy and external callers to construct the module."""
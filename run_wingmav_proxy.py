@@ -25,21 +25,94 @@ from __future__ import annotations
 
 import argparse
 import functools
+import json
 import os
-import select
+import re
+import selectors
 import shlex
+import shutil
 import signal
 import subprocess
 import sys
-import threading
+import time
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional, TextIO
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+_FLAG_CACHE_VERSION = 1
+
+
+def _flag_cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "wingmav" / "mavproxy_flags.json"
+
+
+def _executable_fingerprint(executable: str) -> Optional[Tuple[str, str]]:
+    """Return ``(path, stamp)`` for ``mavproxy.py``; an upgrade changes the stamp."""
+
+    resolved = shutil.which(executable)
+    if not resolved:
+        return None
+    try:
+        st = os.stat(resolved)
+    except OSError:
+        return None
+    return os.path.realpath(resolved), f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _load_flag_cache() -> dict:
+    try:
+        with open(_flag_cache_path(), encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _FLAG_CACHE_VERSION:
+        return {}
+    entries = data.get("mod_path")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _store_flag_cache(entries: dict) -> None:
+    path = _flag_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": _FLAG_CACHE_VERSION, "mod_path": entries}, fh)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # caching is best effort; the probe simply runs again next time
 
 
 @functools.lru_cache(maxsize=1)
 def _mavproxy_supports_mod_path(executable: str) -> bool:
-    """Return ``True`` when ``mavproxy.py`` accepts the ``--mod-path`` flag."""
+    """Return ``True`` when ``mavproxy.py`` accepts the ``--mod-path`` flag.
 
+    Probing means starting MAVProxy with ``--help``, so the answer is also kept
+    on disk keyed by the executable's path, mtime and size.
+    """
+
+    fingerprint = _executable_fingerprint(executable)
+    if fingerprint is None:
+        return _probe_mod_path(executable)
+
+    path, stamp = fingerprint
+    entries = _load_flag_cache()
+    cached = entries.get(path)
+    if (
+        isinstance(cached, dict)
+        and cached.get("stamp") == stamp
+        and isinstance(cached.get("supported"), bool)
+    ):
+        return cached["supported"]
+
+    supported = _probe_mod_path(executable)
+    entries[path] = {"stamp": stamp, "supported": supported}
+    _store_flag_cache(entries)
+    return supported
+
+
+def _probe_mod_path(executable: str) -> bool:
     try:
         result = subprocess.run(
             [executable, "--help"],
@@ -64,56 +137,103 @@ def build_mavproxy_command(
     outs: Iterable[str],
     cmd: Iterable[str],
     mod_path: Path,
-) -> List[str]:
+) -> Tuple[str, ...]:
     """Construct the command line used to launch MAVProxy."""
 
-    command: List[str] = [executable, f"--master={master}"]
+    extra = tuple(cmd)
+    mod_path_part = (f"--mod-path={mod_path}",) if _mavproxy_supports_mod_path(executable) else ()
+    baud_part = (f"--baud={baudrate}",) if baudrate else ()
+    # Ensure the RC module is available so WingMAV can piggy-back on it.
+    load_part = (
+        () if any(part.startswith("--load-module") for part in extra) else ("--load-module=rc",)
+    )
 
-    if _mavproxy_supports_mod_path(executable):
-        command.append(f"--mod-path={mod_path}")
+    return (
+        executable,
+        f"--master={master}",
+        *mod_path_part,
+        *baud_part,
+        *(f"--out={out}" for out in outs),
+        *extra,
+        *load_part,
+    )
 
-    if baudrate:
-        command.append(f"--baud={baudrate}")
 
-    for out in outs:
-        command.append(f"--out={out}")
+class OutputForwarder:
+    """Forward a child's output to this program's stdout, tagging each line.
 
-    command.extend(cmd)
+    Raw chunks are fed in as they are read; only complete lines are written,
+    each prefixed with ``[prefix]``, with a single write and flush per chunk.
+    """
 
-    # Ensure the RC module is available so WingMAV can piggy-back on it.
-    if not any(part.startswith("--load-module") for part in command):
-        command.append("--load-module=rc")
+    def __init__(self, prefix: str, on_line: Optional[Callable[[bytes], None]] = None) -> None:
+        self._tag = f"[{prefix}] ".encode()
+        self._joiner = b"\n" + self._tag
+        self._on_line = on_line
+        self._partial = b""
+
+    def feed(self, chunk: bytes) -> None:
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        if lines:
+            self._emit(lines)
 
-    return command
+    def close(self) -> None:
+        """Flush a trailing line that had no newline."""
 
+        if self._partial:
+            lines, self._partial = [self._partial], b""
+            self._emit(lines)
 
-def stream_output(
-    pipe: TextIO, prefix: str, on_line: Optional[Callable[[str], None]] = None
-) -> None:
-    """Continuously forward MAVProxy output to this program's stdout."""
+    def _emit(self, lines: List[bytes]) -> None:
+        if self._on_line:
+            for line in lines:
+                self._on_line(line)
+        sys.stdout.flush()  # keep ordering with anything printed as text
+        out = sys.stdout.buffer
+        out.write(self._tag + self._joiner.join(lines) + b"\n")
+        out.flush()
 
+
+def open_pidfd(pid: int) -> Optional[int]:
+    """Return a pidfd that becomes readable when ``pid`` exits (Linux 5.3+)."""
+
+    if not hasattr(os, "pidfd_open"):
+        return None
     try:
-        for line in iter(pipe.readline, ""):
-            if not line:
-                break
-            if on_line:
-                on_line(line)
-            sys.stdout.write(f"[{prefix}] {line}")
-            sys.stdout.flush()
-    finally:
-        pipe.close()
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
 
 
 WINGMAV_FAILURE_EXIT = 42
 
+_WINGMAV_RE = re.compile(b"wingmav", re.IGNORECASE)
+# Checked in order; the first match decides the reported reason.
+_WINGMAV_FAILURES = (
+    (
+        re.compile(b"failed to load module", re.IGNORECASE),
+        "MAVProxy reported it failed to load WingMAV.",
+    ),
+    (
+        re.compile(b"no module named", re.IGNORECASE),
+        "WingMAV Python module was not found in MAVProxy's path.",
+    ),
+    (
+        re.compile(b"exception|traceback", re.IGNORECASE),
+        "WingMAV module raised an exception inside MAVProxy.",
+    ),
+)
+
 
 class WingMAVProxyRunner:
     """Supervisor for a MAVProxy process that can load WingMAV on demand."""
 
     def __init__(self, args: argparse.Namespace) -> None:
         self.args = args
-        self.process: Optional[subprocess.Popen[str]] = None
-        self.output_thread: Optional[threading.Thread] = None
+        self.process: Optional[subprocess.Popen[bytes]] = None
+        self._output: Optional[OutputForwarder] = None
+        self._output_fd: Optional[int] = None
         self.auto_load = args.auto_load
         self.joystick_loaded = False
         self._stop_requested = False
@@ -123,6 +243,11 @@ class WingMAVProxyRunner:
         self.supervised_by = args.supervised_by
         self._wingmav_failure_detected = False
         self._last_returncode: Optional[int] = None
+        # Self-pipe used to wake run() early: written by request_stop() and when
+        # MAVProxy's output stream ends, so the poll timeout can stay long.
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
 
     # ------------------------------------------------------------------
     def start(self) -> None:
@@ -156,8 +281,7 @@ class WingMAVProxyRunner:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
+                bufsize=0,
                 env=env,
             )
         except OSError as exc:
@@ -168,17 +292,50 @@ class WingMAVProxyRunner:
             print(f"ERROR: Failed to launch MAVProxy: {exc}")
             return
 
+        # MAVProxy's output is drained by the same selector loop that watches
+        # STDIN, so no forwarding thread is needed.
         assert self.process.stdout is not None
-        self.output_thread = threading.Thread(
-            target=stream_output,
-            args=(self.process.stdout, "MAVProxy", self._handle_mavproxy_line),
-            daemon=True,
-        )
-        self.output_thread.start()
+        self._output = OutputForwarder("MAVProxy", self._handle_mavproxy_line)
+        self._output_fd = self.process.stdout.fileno()
+        os.set_blocking(self._output_fd, False)
 
         if self.auto_load:
             self._load_wingmav_module()
 
+    # ------------------------------------------------------------------
+    def _read_output(self) -> bool:
+        """Forward one chunk of MAVProxy output; return ``False`` once it hits EOF."""
+
+        if self._output_fd is None:
+            return False
+        try:
+            chunk = os.read(self._output_fd, 65536)
+        except BlockingIOError:
+            return True
+        except OSError:
+            chunk = b""
+        if chunk:
+            self._output.feed(chunk)
+            return True
+        self._close_output()
+        return False
+
+    # ------------------------------------------------------------------
+    def _close_output(self) -> None:
+        if self._output_fd is None:
+            return
+        self._output.close()
+        self._output_fd = None
+        if self.process and self.process.stdout:
+            self.process.stdout.close()
+
+    # ------------------------------------------------------------------
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass  # pipe already full (a wake-up is pending) or closed
+
     # ------------------------------------------------------------------
     def _load_wingmav_module(self) -> None:
         if not self.process or not self.process.stdin:
@@ -189,42 +346,39 @@ class WingMAVProxyRunner:
         load_cmd = "module load wingmav"
         if self._wingmav_args:
             load_cmd += " " + " ".join(self._wingmav_args)
-        self._write_to_mavproxy(load_cmd + "\n")
+        self._write_to_mavproxy((load_cmd + "\n").encode())
         self.joystick_loaded = True
 
     # ------------------------------------------------------------------
-    def _write_to_mavproxy(self, data: str) -> None:
+    def _write_to_mavproxy(self, data: bytes) -> None:
         if not self.process or not self.process.stdin:
             return
+        stdin = self.process.stdin
         try:
-            self.process.stdin.write(data)
-            self.process.stdin.flush()
+            # stdin is an unbuffered FileIO, so a single write() may be short.
+            view = memoryview(data)
+            while view:
+                view = view[stdin.write(view):]
         except (BrokenPipeError, OSError, ValueError) as exc:
             print(f"ERROR: Failed to write to MAVProxy stdin: {exc}")
             self._last_returncode = self.process.returncode if self.process else 1
             self.request_stop()
 
     # ------------------------------------------------------------------
-    def _handle_mavproxy_line(self, line: str) -> None:
+    def _handle_mavproxy_line(self, line: bytes) -> None:
         """Watch MAVProxy output for WingMAV specific failures."""
 
         if self._wingmav_failure_detected:
             return
 
-        lower_line = line.lower()
-        if "wingmav" not in lower_line:
+        # Most output is telemetry chatter; reject it without lowercasing.
+        if not _WINGMAV_RE.search(line):
             return
 
-        failure_reason: Optional[str] = None
-        if "failed to load module" in lower_line:
-            failure_reason = "MAVProxy reported it failed to load WingMAV."
-        elif "no module named" in lower_line and "wingmav" in lower_line:
-            failure_reason = "WingMAV Python module was not found in MAVProxy's path."
-        elif "exception" in lower_line or "traceback" in lower_line:
-            failure_reason = "WingMAV module raised an exception inside MAVProxy."
-
-        if failure_reason:
-            self._report_wingmav_failure(failure_reason)
+        for pattern, reason in _WINGMAV_FAILURES:
+            if pattern.search(line):
+                self._report_wingmav_failure(reason)
+                return
 
     # ------------------------------------------------------------------
     def _report_wingmav_failure(self, reason: str) -> None:
@@ -245,19 +399,57 @@ class WingMAVProxyRunner:
                 return self._last_returncode
             return 0
 
+        # STDIN is read straight from its descriptor so that data buffered inside
+        # sys.stdin can never hide behind a selector that reports "not ready".
+        stdin_fd = sys.stdin.fileno()
+        selector = None
+        exit_fd = None
+        exited = False
         try:
-            while not self._stop_requested:
-                if self.process.poll() is not None:
+            selector = selectors.DefaultSelector()
+            try:
+                selector.register(stdin_fd, selectors.EVENT_READ)
+            except PermissionError:
+                # epoll refuses regular files and /dev/null (``< cmds.txt``);
+                # select() accepts them and reports them as always readable.
+                selector.close()
+                selector = selectors.SelectSelector()
+                selector.register(stdin_fd, selectors.EVENT_READ)
+            selector.register(self._wake_r, selectors.EVENT_READ)
+            selector.register(self._output_fd, selectors.EVENT_READ)
+            # With a pidfd, MAVProxy exiting is just another selector event.
+            exit_fd = open_pidfd(self.process.pid)
+            if exit_fd is not None:
+                selector.register(exit_fd, selectors.EVENT_READ)
+            while not self._stop_requested and not exited:
+                if exit_fd is None and self.process.poll() is not None:
                     break
 
-                try:
-                    rlist, _, _ = select.select([sys.stdin], [], [], self.args.poll_interval)
-                except InterruptedError:
-                    continue
-                if sys.stdin in rlist:
-                    data = sys.stdin.readline()
-                    if data == "":
+                for key, _ in selector.select(self.args.poll_interval):
+                    if key.fd == exit_fd:
+                        exited = True
+                        break
+                    if key.fd == self._wake_r:
+                        try:
+                            os.read(self._wake_r, 64)
+                        except OSError:
+                            pass
+                        continue
+                    if key.fd == self._output_fd:
+                        if not self._read_output():
+                            selector.unregister(key.fd)
+                            if exit_fd is None:
+                                # MAVProxy closed its output, which almost always
+                                # means it exited; give it a moment to be reaped.
+                                try:
+                                    self.process.wait(timeout=1)
+                                except subprocess.TimeoutExpired:
+                                    pass
+                        continue
+                    data = os.read(stdin_fd, 65536)
+                    if not data:
                         # EOF → main script ended. Break out to terminate gracefully.
+                        self._stop_requested = True
                         break
                     if not self.joystick_loaded:
                         self._load_wingmav_module()
@@ -266,6 +458,10 @@ class WingMAVProxyRunner:
         except KeyboardInterrupt:
             print("Received Ctrl+C. Stopping MAVProxy …")
         finally:
+            if selector is not None:
+                selector.close()
+            if exit_fd is not None:
+                os.close(exit_fd)
             self.stop()
         if self._wingmav_failure_detected:
             return WINGMAV_FAILURE_EXIT
@@ -280,22 +476,64 @@ class WingMAVProxyRunner:
             return
         if self.process.poll() is None:
             self.process.terminate()
-            try:
-                self.process.wait(timeout=10)
-            except subprocess.TimeoutExpired:
+            if not self._wait_draining_output(10):
                 print("MAVProxy did not exit in time; killing …")
                 self.process.kill()
+                self.process.wait()
+        # Forward whatever MAVProxy printed before it exited.
+        self._drain_output()
+        self._close_output()
         self._last_returncode = self.process.returncode
         self.process = None
-        if self.output_thread and self.output_thread.is_alive():
-            self.output_thread.join(timeout=1)
-        self.output_thread = None
+
+    # ------------------------------------------------------------------
+    def _wait_draining_output(self, timeout: float) -> bool:
+        """Wait for MAVProxy to exit while still forwarding what it prints."""
+
+        deadline = time.monotonic() + timeout
+        exit_fd = open_pidfd(self.process.pid)
+        try:
+            with selectors.DefaultSelector() as selector:
+                if self._output_fd is not None:
+                    selector.register(self._output_fd, selectors.EVENT_READ)
+                if exit_fd is not None:
+                    selector.register(exit_fd, selectors.EVENT_READ)
+                while self.process.poll() is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    # Without a pidfd, wake periodically to poll for the exit.
+                    wait = remaining if exit_fd is not None else min(remaining, 0.1)
+                    for key, _ in selector.select(wait):
+                        if key.fd == self._output_fd and not self._read_output():
+                            selector.unregister(key.fd)
+        finally:
+            if exit_fd is not None:
+                os.close(exit_fd)
+        return True
+
+    # ------------------------------------------------------------------
+    def _drain_output(self) -> None:
+        """Forward output already sitting in the pipe without waiting for more."""
+
+        while self._output_fd is not None:
+            try:
+                chunk = os.read(self._output_fd, 65536)
+            except BlockingIOError:
+                return
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self._close_output()
+                return
+            self._output.feed(chunk)
 
     # ------------------------------------------------------------------
     def request_stop(self) -> None:
         """Ask the runner to stop at the next opportunity."""
 
         self._stop_requested = True
+        self._wake()
 
 
 # ----------------------------------------------------------------------
@@ -332,8 +570,11 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--poll-interval",
         type=float,
-        default=0.5,
-        help="How frequently (seconds) to poll for STDIN data (default: %(default)s)",
+        default=5.0,
+        help=(
+            "Upper bound (seconds) between MAVProxy liveness checks; STDIN data and "
+            "stop requests are handled immediately (default: %(default)s)"
+        ),
     )
     parser.add_argument(
         "--auto-load",
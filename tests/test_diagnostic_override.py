@@ -0,0 +1,65 @@
+"""Rate-limited RC overrides in the diagnostic session."""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import diagnostic_wingmav  # noqa: E402
+
+
+def make_session():
+    pg = types.SimpleNamespace(
+        JOYAXISMOTION=0x600,
+        JOYBUTTONDOWN=0x603,
+        JOYBUTTONUP=0x604,
+        JOYDEVICEADDED=0x605,
+        JOYDEVICEREMOVED=0x606,
+    )
+    reporter = diagnostic_wingmav.MavlinkReporter(
+        None,
+        target_system=1,
+        target_component=1,
+        source_system=255,
+        source_component=0,
+        wait_heartbeat=False,
+        verbose=False,
+    )
+    session = diagnostic_wingmav.JoystickSession(
+        pg,
+        device_index=0,
+        poll_hz=100,
+        override_hz=1.0,
+        duration=None,
+        mavlink=reporter,
+        verbose=False,
+    )
+    session._send_override()
+    return session
+
+
+def test_moving_back_within_rate_window_drops_pending_send():
+    session = make_session()
+    session.axis_values[0] = 0.5
+    session._send_override()
+    assert session._send_pending
+
+    session.axis_values[0] = 0.0
+    session._send_override()
+    assert not session._send_pending
+
+
+def test_unchanged_pwm_drops_pending_send():
+    session = make_session()
+    session.axis_values[0] = 1.0
+    session._send_override(force=True)
+    session.axis_values[1] = 0.5
+    session._send_override()
+    assert session._send_pending
+
+    # Past full deflection the clamped PWM matches what was last sent.
+    session.axis_values[0] = 1.5
+    session.axis_values[1] = 0.0
+    session._send_override()
+    assert not session._send_pending
@@ -0,0 +1,95 @@
+"""The module's SDL event filter must not outlive it."""
+
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("pymavlink")
+pytest.importorskip("MAVProxy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mavproxy_wingmav  # noqa: E402
+
+
+class FakeEvent:
+    """pygame.event subset backed by a set of blocked types, like SDL's filter."""
+
+    def __init__(self, numevents):
+        self._all = range(numevents)
+        self.blocked = set()
+
+    @staticmethod
+    def _types(t):
+        return t if isinstance(t, (list, tuple)) else [t]
+
+    def set_blocked(self, t):
+        self.blocked.update(self._all if t is None else self._types(t))
+
+    def set_allowed(self, t):
+        if t is None:
+            self.blocked.clear()
+        else:
+            self.blocked.difference_update(self._types(t))
+
+    def get_blocked(self, t):
+        return any(x in self.blocked for x in self._types(t))
+
+    def clear(self, *args, **kwargs):
+        pass
+
+
+def make_pygame():
+    pg = types.SimpleNamespace(
+        NUMEVENTS=0x10000,
+        QUIT=0x100,
+        KEYDOWN=0x300,
+        MOUSEMOTION=0x400,
+        JOYAXISMOTION=0x600,
+        JOYBUTTONDOWN=0x603,
+        JOYBUTTONUP=0x604,
+        JOYDEVICEADDED=0x605,
+        JOYDEVICEREMOVED=0x606,
+        init=lambda: None,
+        joystick=types.SimpleNamespace(init=lambda: None, get_count=lambda: 0),
+    )
+    pg.event = FakeEvent(pg.NUMEVENTS)
+    return pg
+
+
+def make_mpstate():
+    return types.SimpleNamespace(
+        command_map={},
+        completions={},
+        public_modules={},
+        module=lambda name: None,
+    )
+
+
+def load(pg):
+    return mavproxy_wingmav.init(make_mpstate(), pygame_module=pg, auto_connect=False)
+
+
+def test_unload_allows_other_event_types_again():
+    pg = make_pygame()
+    module = load(pg)
+    assert pg.event.get_blocked(pg.KEYDOWN)
+    assert not pg.event.get_blocked(pg.JOYDEVICEADDED)
+
+    module.unload()
+
+    for t in (pg.QUIT, pg.KEYDOWN, pg.MOUSEMOTION, pg.JOYAXISMOTION):
+        assert not pg.event.get_blocked(t)
+
+
+def test_unload_keeps_types_blocked_before_load():
+    pg = make_pygame()
+    pg.event.set_blocked(pg.MOUSEMOTION)
+    module = load(pg)
+
+    module.unload()
+
+    assert pg.event.get_blocked(pg.MOUSEMOTION)
+    assert not pg.event.get_blocked(pg.KEYDOWN)
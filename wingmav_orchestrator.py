@@ -15,27 +15,70 @@ Key behaviours
   troubleshooting once repeated failures occur.
 * Long-lived successful runs reset the failure counters so WingMAV can be
   re-enabled automatically after a stable period.
+* A pseudo-terminal is only placed between the operator and MAVProxy when stdin
+  is a terminal; unattended, MAVProxy writes straight to the supervisor's
+  stdout/stderr.
 """
 
 from __future__ import annotations
 
 import argparse
+import errno
 import os
 import select
+import selectors
 import signal
+import stat
 import subprocess
 import sys
 import textwrap
 import time
-from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from run_wingmav_proxy import WINGMAV_FAILURE_EXIT
+from run_wingmav_proxy import WINGMAV_FAILURE_EXIT, open_pidfd
 
 DEFAULT_MASTER = "/dev/ttyUSB0"
 DEFAULT_OUT = "udp:127.0.0.1:14550"
 DEFAULT_BAUD = 115200
+# Bytes moved per read between the terminal and the MAVProxy PTY; large enough
+# to carry several MAVLink frames and console lines per syscall.
+FORWARD_CHUNK = 8192
+# Upper bound (seconds) on how long the forwarding loop sleeps between checks
+# that the MAVProxy child is still running.
+CHILD_POLL_INTERVAL = 1.0
+# Seconds a stopping child gets between SIGTERM and SIGKILL.
+STOP_GRACE_PERIOD = 10.0
+
+
+def _is_pipe(fd: int) -> bool:
+    """Return ``True`` when ``fd`` is a pipe/FIFO that ``os.splice`` can fill."""
+
+    if not hasattr(os, "splice"):
+        return False
+    try:
+        return stat.S_ISFIFO(os.fstat(fd).st_mode)
+    except OSError:
+        return False
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of ``data`` to ``fd``, resuming after short writes."""
+
+    view = memoryview(data)
+    while view:
+        try:
+            view = view[os.write(fd, view):]
+        except BlockingIOError:
+            # Non-blocking stdout (e.g. shared with a parent): wait until it drains.
+            select.select([], [fd], [])
+
+
+def _isatty(stream: object) -> bool:
+    try:
+        return stream.isatty()  # type: ignore[attr-defined]
+    except (AttributeError, OSError, ValueError):
+        return False
 
 
 class MAVProxyOrchestrator:
@@ -48,42 +91,85 @@ class MAVProxyOrchestrator:
         self.diagnostic_mode = False
         self.repo_root = Path(__file__).resolve().parent
         self._pty_master: Optional[int] = None
+        self._splice_output = False
+        # Only allocate a PTY and forward bytes when an operator can type into it.
+        self._interactive = _isatty(sys.stdin)
+        self._command_cache: Dict[Tuple[bool, bool], Tuple[str, ...]] = {}
+        self._pretty_cache: Dict[Tuple[bool, bool], str] = {}
+        # The environment does not change across restarts; build it once, as
+        # bytes so Popen can hand it to execve without re-encoding each entry.
+        self._child_env = dict(os.environb)
+        self._child_env.setdefault(b"PYTHONUNBUFFERED", b"1")
+        # Self-pipe written by request_stop() (and signals, see main()) so the
+        # forwarding loop wakes at once.
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
         self.debug_enabled = bool(args.debug)
-        self.log_file = None
+        self._ts_sec = -1
+        self._ts_str = ""
+        # Log lines go straight to the file descriptors so they stay ordered with
+        # the raw PTY bytes forwarded to stdout and need no separate flush.
+        try:
+            self._stdout_fd: Optional[int] = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            self._stdout_fd = None
+        self._log_fd: Optional[int] = None
         if self.debug_enabled and args.log_file:
             try:
-                self.log_file = open(args.log_file, "a", buffering=1)
+                self._log_fd = os.open(
+                    args.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+                )
             except OSError as exc:
                 print(f"WARNING: could not open log file {args.log_file!r}: {exc}")
-                self.log_file = None
+                self._log_fd = None
         elif args.log_file:
             print(
                 "Debug mode is disabled; ignoring --log-file and writing only to the console."
             )
+        sys.stdout.flush()
 
     # ------------------------------------------------------------------
     def log(self, message: str) -> None:
-        timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        line = f"[{timestamp}] {message}"
-        print(line)
-        if self.log_file:
+        sec = int(time.time())
+        if sec != self._ts_sec:
+            # Re-render the UTC timestamp only when the second rolls over.
+            self._ts_sec = sec
+            self._ts_str = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec))
+        line = f"[{self._ts_str}] {message}\n".encode()
+        if self._stdout_fd is not None:
             try:
-                self.log_file.write(line + "\n")
-                self.log_file.flush()
-            except OSError:
+                _write_all(self._stdout_fd, line)
+            except BrokenPipeError:
                 pass
+        else:
+            sys.stdout.buffer.write(line)
+            sys.stdout.flush()
+        if self._log_fd is not None:
+            _write_all(self._log_fd, line)
 
     # ------------------------------------------------------------------
     def _close_log(self) -> None:
-        if self.log_file:
+        if self._log_fd is not None:
             try:
-                self.log_file.close()
+                os.close(self._log_fd)
             except OSError:
                 pass
-            self.log_file = None
+            self._log_fd = None
+
+    # ------------------------------------------------------------------
+    def build_command(self) -> Tuple[str, ...]:
+        # Only these two flags change between restarts, so a crash loop reuses
+        # the same argv instead of rebuilding it on every attempt.
+        key = (self.wingmav_enabled, self.diagnostic_mode)
+        command = self._command_cache.get(key)
+        if command is None:
+            command = self._command_cache[key] = tuple(self._assemble_command())
+            self._pretty_cache[key] = " ".join(command)
+        return command
 
     # ------------------------------------------------------------------
-    def build_command(self) -> List[str]:
+    def _assemble_command(self) -> List[str]:
         master = self.args.master
         outs = self.args.out or [DEFAULT_OUT]
         baud = self.args.baud
@@ -116,29 +202,36 @@ class MAVProxyOrchestrator:
     # ------------------------------------------------------------------
     def run_once(self) -> int:
         command = self.build_command()
-        pretty = " ".join(command)
+        pretty = self._pretty_cache[(self.wingmav_enabled, self.diagnostic_mode)]
         self.log(f"Starting MAVProxy command: {pretty}")
 
-        env = os.environ.copy()
-        env.setdefault("PYTHONUNBUFFERED", "1")
-
-        master_fd, slave_fd = os.openpty()
+        master_fd: Optional[int]
+        slave_fd: Optional[int]
+        if self._interactive:
+            # Launch MAVProxy connected to the slave side of a pseudo-terminal so
+            # interactive users can work with it as if it were running directly
+            # in the foreground.
+            master_fd, slave_fd = os.openpty()
+            stdio = {"stdin": slave_fd, "stdout": slave_fd, "stderr": slave_fd}
+        else:
+            # Nobody is at a terminal (service manager, init script): MAVProxy
+            # writes straight to our stdout/stderr and there is nothing to
+            # forward.  Its stdin is a pipe held open so neither it nor the
+            # WingMAV runner sees EOF and shuts down.
+            master_fd = slave_fd = None
+            stdio = {"stdin": subprocess.PIPE}
 
-        # Launch MAVProxy connected to the slave side of the pseudo-terminal so
-        # interactive users can work with it as if it were running directly in
-        # the foreground.
         try:
             self.current_proc = subprocess.Popen(
                 command,
-                stdin=slave_fd,
-                stdout=slave_fd,
-                stderr=slave_fd,
-                env=env,
+                env=self._child_env,
                 close_fds=True,
+                **stdio,
             )
         except OSError as exc:
-            os.close(slave_fd)
-            os.close(master_fd)
+            if master_fd is not None:
+                os.close(slave_fd)
+                os.close(master_fd)
             self._pty_master = None
             self.log(f"Failed to launch MAVProxy: {exc}")
             self.failures += 1
@@ -148,56 +241,83 @@ class MAVProxyOrchestrator:
                 self.diagnostic_mode = True
             return 1
 
-        os.close(slave_fd)
+        if slave_fd is not None:
+            os.close(slave_fd)
         self._pty_master = master_fd
 
         # Forward data between the controlling terminal and the MAVProxy child
         # while it is alive.  This keeps prompts responsive and allows
         # operators to type commands directly into MAVProxy when needed.
-        stdin_fd: Optional[int]
-        try:
-            stdin_fd = sys.stdin.fileno()
-        except (AttributeError, OSError):
-            stdin_fd = None
+        stdin_fd: Optional[int] = None
+        if master_fd is not None:
+            try:
+                stdin_fd = sys.stdin.fileno()
+            except (AttributeError, OSError):
+                stdin_fd = None
 
         try:
             stdout_fd = sys.stdout.fileno()
         except (AttributeError, OSError):
             stdout_fd = None
 
-        fds = [master_fd]
+        selector = selectors.DefaultSelector()
+        if master_fd is not None:
+            selector.register(master_fd, selectors.EVENT_READ)
         if stdin_fd is not None:
-            fds.append(stdin_fd)
-
-        start_time = time.time()
+            selector.register(stdin_fd, selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        # A pidfd turns child exit into a selector event, so the loop can block
+        # without a timeout; without one, fall back to polling the child.
+        exit_fd = open_pidfd(self.current_proc.pid)
+        if exit_fd is not None:
+            selector.register(exit_fd, selectors.EVENT_READ)
+            timeout = None
+        else:
+            timeout = CHILD_POLL_INTERVAL
+
+        # When stdout is a pipe the kernel can move PTY output into it directly.
+        self._splice_output = (
+            master_fd is not None and stdout_fd is not None and _is_pipe(stdout_fd)
+        )
+
+        start_time = time.monotonic()
+        # On a stop request the child gets SIGTERM, then SIGKILL once the grace
+        # period runs out; the deadline is folded into the selector timeout.
+        kill_at: Optional[float] = None
+        killed = False
         while True:
-            if self.stop_requested and self.current_proc.poll() is None:
+            if exit_fd is None and self.current_proc.poll() is not None:
+                break
+
+            if self.stop_requested and kill_at is None and not killed:
                 self.current_proc.terminate()
+                kill_at = time.monotonic() + STOP_GRACE_PERIOD
+
+            wait = timeout
+            if kill_at is not None:
+                remaining = kill_at - time.monotonic()
+                if remaining <= 0:
+                    self.log("Child did not exit promptly; killing …")
+                    self.current_proc.kill()
+                    killed = True
+                    kill_at = None
+                else:
+                    wait = remaining if wait is None else min(wait, remaining)
 
-            if self.current_proc.poll() is not None:
-                break
+            # PTY output, operator input, signals/stop requests and child exit all
+            # wake the selector.
+            readable = {key.fd for key, _ in selector.select(wait)}
 
-            try:
-                readable, _, _ = select.select(fds, [], [], 0.1)
-            except InterruptedError:
-                continue
+            if self._wake_r in readable:
+                self._drain_wakeups()
 
-            if master_fd in readable:
-                try:
-                    data = os.read(master_fd, 1024)
-                except OSError:
-                    data = b""
-                if not data:
+            if master_fd is not None and master_fd in readable:
+                if not self._forward_child_output(master_fd, stdout_fd):
                     break
-                if stdout_fd is not None:
-                    os.write(stdout_fd, data)
-                else:
-                    sys.stdout.buffer.write(data)
-                    sys.stdout.buffer.flush()
 
             if stdin_fd is not None and stdin_fd in readable:
                 try:
-                    user_input = os.read(stdin_fd, 1024)
+                    user_input = os.read(stdin_fd, FORWARD_CHUNK)
                 except OSError:
                     user_input = b""
                 if not user_input:
@@ -209,9 +329,20 @@ class MAVProxyOrchestrator:
                     break
                 os.write(master_fd, user_input)
 
+            if exit_fd is not None and exit_fd in readable:
+                break
+
+        selector.close()
+        if exit_fd is not None:
+            os.close(exit_fd)
         try:
             return_code = self.current_proc.wait()
         finally:
+            if self.current_proc.stdin is not None:
+                try:
+                    self.current_proc.stdin.close()
+                except OSError:
+                    pass
             self.current_proc = None
             if self._pty_master is not None:
                 try:
@@ -220,7 +351,7 @@ class MAVProxyOrchestrator:
                     pass
             self._pty_master = None
 
-        runtime = time.time() - start_time
+        runtime = time.monotonic() - start_time
         self.log(f"MAVProxy exited with return code {return_code} after {runtime:.1f}s")
 
         if return_code == WINGMAV_FAILURE_EXIT:
@@ -254,6 +385,47 @@ class MAVProxyOrchestrator:
 
         return return_code
 
+    # ------------------------------------------------------------------
+    def _forward_child_output(self, master_fd: int, stdout_fd: Optional[int]) -> bool:
+        """Copy one chunk of MAVProxy output to stdout; return ``False`` at EOF."""
+
+        if self._splice_output:
+            try:
+                return os.splice(master_fd, stdout_fd, FORWARD_CHUNK) > 0
+            except OSError as exc:
+                if exc.errno not in (errno.EINVAL, errno.ENOSYS):
+                    return False
+                # This PTY/pipe pair cannot splice; copy through user space instead.
+                self._splice_output = False
+
+        try:
+            data = os.read(master_fd, FORWARD_CHUNK)
+        except OSError:
+            data = b""
+        if not data:
+            return False
+        if stdout_fd is not None:
+            _write_all(stdout_fd, data)
+        else:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        return True
+
+    # ------------------------------------------------------------------
+    @property
+    def wakeup_fd(self) -> int:
+        """Write end of the self-pipe that wakes the forwarding loop."""
+
+        return self._wake_w
+
+    # ------------------------------------------------------------------
+    def _drain_wakeups(self) -> None:
+        try:
+            while os.read(self._wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+
     # ------------------------------------------------------------------
     def run(self) -> None:
         while not self.stop_requested:
@@ -261,28 +433,33 @@ class MAVProxyOrchestrator:
             if self.stop_requested:
                 break
             self.log(f"Restarting in {self.args.restart_delay}s …")
-            for _ in range(int(self.args.restart_delay / 0.5)):
-                if self.stop_requested:
-                    break
-                time.sleep(0.5)
-            else:
-                remaining = self.args.restart_delay % 0.5
-                if remaining:
-                    time.sleep(remaining)
+            self._wait_for_restart(self.args.restart_delay)
         self._close_log()
 
+    # ------------------------------------------------------------------
+    def _wait_for_restart(self, delay: float) -> None:
+        """Sleep for ``delay`` seconds, returning early once a stop is requested."""
+
+        deadline = time.monotonic() + delay
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wake_r, selectors.EVENT_READ)
+            while not self.stop_requested:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if selector.select(remaining):
+                    self._drain_wakeups()
+
     # ------------------------------------------------------------------
     def request_stop(self, *_: object) -> None:
         self.log("Stop requested — terminating child process if needed.")
         self.stop_requested = True
-        if self.current_proc and self.current_proc.poll() is None:
-            self.current_proc.terminate()
-            try:
-                self.current_proc.wait(timeout=10)
-            except subprocess.TimeoutExpired:
-                self.log("Child did not exit promptly; killing …")
-                self.current_proc.kill()
-        self._close_log()
+        # The forwarding loop terminates (and if need be kills) the child; this
+        # only has to wake it, so the signal handler never blocks.
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass  # a wake-up is already pending
 
 
 def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -368,6 +545,9 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
 
     signal.signal(signal.SIGINT, orchestrator.request_stop)
     signal.signal(signal.SIGTERM, orchestrator.request_stop)
+    # Signals also poke the self-pipe at C level, waking the forwarding loop even
+    # before the Python-level handler gets to run.
+    signal.set_wakeup_fd(orchestrator.wakeup_fd, warn_on_full_buffer=False)
 
     orchestrator.run()
     return 0